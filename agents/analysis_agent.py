@@ -1,8 +1,8 @@
 
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
-from utils.config import settings
-import google.generativeai as genai
+from utils.messages import AgentMessage
+from utils.model_router import router
 import json # Make sure json is imported
 
 class AnalysisAgent(BaseAgent):
@@ -10,10 +10,8 @@ class AnalysisAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("analysis")
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
     
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, input_data: Dict[str, Any]) -> AgentMessage:
         """Process and analyze the input data."""
         data = input_data.get("data", {})
         context = input_data.get("context", {})
@@ -42,21 +40,21 @@ class AnalysisAgent(BaseAgent):
             ONLY return the raw JSON object.
             """
             
-            response = self.model.generate_content(analysis_prompt)
+            response = await router.generate(self.name, analysis_prompt)
             json_text = response.text.strip().replace("```json", "").replace("```", "")
             analysis_data = json.loads(json_text)
 
-            output = {
-                "data": {
+            output = AgentMessage(
+                data={
                     "research_summary": research_summary,
                     "source_data": data.get("source_data", {}),
                     "analysis": analysis_data.get("analysis_text", ""),
                     "insights": analysis_data.get("insights", []),
                     "recommendations": analysis_data.get("recommendations", []),
                 },
-                "context": context,
-                "status": "completed"
-            }
+                context=context,
+                status="completed"
+            )
             
             self.update_confidence(0.9) # CHANGED: Set a high confidence on success to prevent looping
             self.add_to_history(input_data, output)
@@ -69,7 +67,7 @@ class AnalysisAgent(BaseAgent):
             return self._create_error_output(error_message, context)
 
     # CHANGED: The function now accepts and preserves the original context.
-    def _create_error_output(self, error_message: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_error_output(self, error_message: str, context: Dict[str, Any]) -> AgentMessage:
         """Create an error output with appropriate structure, preserving context."""
         # On error, we set confidence low so should_continue() could be true,
         # but the orchestrator loop is the main driver. This ensures the agent state is 'failed'.
@@ -78,12 +76,12 @@ class AnalysisAgent(BaseAgent):
         error_context = context.copy()
         error_context["error"] = error_message
 
-        return {
-            "data": {
+        return AgentMessage(
+            data={
                 "analysis": f"Error: {error_message}",
                 "insights": [],
                 "recommendations": []
             },
-            "context": error_context, # Return the preserved context with the error added
-            "status": "error"
-        }
\ No newline at end of file
+            context=error_context, # Return the preserved context with the error added
+            status="error"
+        )
\ No newline at end of file
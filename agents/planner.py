@@ -1,8 +1,9 @@
 
+from collections.abc import Mapping
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
-from utils.config import settings
-import google.generativeai as genai
+from utils.messages import AgentMessage, dumps
+from utils.model_router import router
 import json
 
 class PlannerAgent(BaseAgent):
@@ -10,12 +11,10 @@ class PlannerAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("planner")
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20') # CHANGED: Using gemini-pro for better structured output
     
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, input_data: Dict[str, Any]) -> AgentMessage:
         """Process the user goal and create an execution plan."""
-        if not isinstance(input_data, dict):
+        if not isinstance(input_data, Mapping):
             return self._create_error_output("Invalid input data format")
             
         goal = input_data.get("goal", "")
@@ -38,7 +37,7 @@ class PlannerAgent(BaseAgent):
         }}
         """
         
-        response = self.model.generate_content(prompt)
+        response = await router.generate(self.name, prompt)
         
         # CHANGED: Robust JSON parsing
         try:
@@ -51,29 +50,25 @@ class PlannerAgent(BaseAgent):
             plan = response.text
             agent_order = self._determine_agent_order_fallback(plan)
         
-        output = {
-            "data": {
-                "plan": plan
-            },
-            "context": {
-                "goal": goal
-            },
-            "agent_order": agent_order,
-            "status": "planned"
-        }
+        output = AgentMessage(
+            data={"plan": plan},
+            context={"goal": goal},
+            status="planned",
+            agent_order=agent_order
+        )
         
         self.update_confidence(0.9)
         self.add_to_history(input_data, output)
         
         return output
     
-    def _create_error_output(self, error_message: str) -> Dict[str, Any]:
-        return {
-            "data": {"plan": f"Error: {error_message}"},
-            "context": {"error": error_message},
-            "agent_order": [],
-            "status": "error"
-        }
+    def _create_error_output(self, error_message: str) -> AgentMessage:
+        return AgentMessage(
+            data={"plan": f"Error: {error_message}"},
+            context={"error": error_message},
+            status="error",
+            agent_order=[]
+        )
     
     def _determine_agent_order_fallback(self, plan: str) -> List[str]:
         # NEW: A slightly more robust fallback if JSON parsing fails
@@ -90,10 +85,11 @@ class PlannerAgent(BaseAgent):
     
     async def evaluate_goal_satisfaction(self, final_output: Dict[str, Any], original_goal: str) -> float:
         """Evaluate how well the final output satisfies the original goal."""
-        if not isinstance(final_output, dict):
+        if not isinstance(final_output, Mapping):
             return 0.0
             
-        output_text = json.dumps(final_output.get("data", {}))
+        # Raw API payloads stay as references here; the report is what gets scored.
+        output_text = dumps(final_output.get("data", {}), resolve_payloads=False)
         
         # CHANGED: More specific prompt to ensure a float is returned
         prompt = f"""
@@ -107,7 +103,7 @@ class PlannerAgent(BaseAgent):
         ONLY return the number.
         """
         
-        response = self.model.generate_content(prompt)
+        response = await router.generate(self.name, prompt)
         try:
             satisfaction_score = float(response.text.strip())
             return min(max(satisfaction_score, 0.0), 1.0)
@@ -1,23 +1,50 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional, Tuple
 from .base_agent import BaseAgent
-from utils.config import settings
+from utils.messages import AgentMessage, payloads
 from utils.api_helpers import (
     get_spacex_launch,
     get_weather,
     extract_launch_location,
     analyze_weather_impact
 )
-import google.generativeai as genai
+from utils.model_router import router
+from utils.scheduler import resource_slot
 
 class ResearchAgent(BaseAgent):
     """Agent responsible for gathering relevant information."""
     
     def __init__(self):
         super().__init__("research")
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
+        # Launch/weather fetches started before the plan arrived, keyed by goal.
+        self._prefetched: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def is_spacex_query(goal: str) -> bool:
+        """Whether the goal takes the targeted launch/weather research path."""
+        return "spacex" in goal.lower() and "launch" in goal.lower()
+
+    def start_prefetch(self, goal: str) -> bool:
+        """
+        Speculatively start the plan-independent launch/weather fetches for a goal.
+        Returns False if the goal would not use them.
+        """
+        if not self.is_spacex_query(goal) or goal in self._prefetched:
+            return False
+        self._prefetched[goal] = asyncio.create_task(self._gather_launch_data())
+        return True
+
+    def discard_prefetch(self, goal: str) -> None:
+        """Drop (and cancel, if still running) a speculative fetch that will not be used."""
+        task = self._prefetched.pop(goal, None)
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()  # Mark a failed fetch as retrieved so asyncio does not warn.
     
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, input_data: Dict[str, Any]) -> AgentMessage:
         """Process the input and gather relevant information."""
         context = input_data.get("context", {})
         goal = context.get("goal", "")
@@ -26,62 +53,36 @@ class ResearchAgent(BaseAgent):
         if not goal:
             return self._create_error_output("No goal specified in context")
 
-        is_spacex_query = "spacex" in goal.lower() and "launch" in goal.lower()
+        is_spacex_query = self.is_spacex_query(goal)
         
         research_summary = ""
         source_data = {}
 
         try:
             if is_spacex_query:
-                print("Conducting targeted launch research via RocketLaunch.Live...")
-                launch_data = await get_spacex_launch()
-                location = await extract_launch_location(launch_data)
-                
-                if location:
-                    weather_data = await get_weather(location["lat"], location["lon"])
-                    weather_analysis = analyze_weather_impact(weather_data, launch_data)
-                    
-                    # CHANGED: Update this section to use the new field names from RocketLaunch.Live
-                    mission_name = launch_data.get('name', 'N/A')
-                    launch_time = launch_data.get('t0') or launch_data.get('win_open') or 'N/A'
-                    
-                    # Correctly access the nested pad and location names.
-                    pad_object = launch_data.get("pad", {})
-                    location_object = pad_object.get("location", {})
-                    launch_site_name = location_object.get("name", "Unknown Site")
-                    pad_name = pad_object.get("name", "Unknown Pad")
-
-                    research_summary = (
-                        f"Research on the next SpaceX launch for goal: '{goal}'.\n"
-                        f"Mission: {mission_name}\n"
-                        f"Scheduled Time (UTC): {launch_time}\n"
-                        f"Launch Site: {launch_site_name} - {pad_name}\n"
-                        f"Weather at site: {weather_analysis['conditions']['description']}.\n"
-                        f"Potential weather impacts: {', '.join(weather_analysis['potential_impacts'])}"
-                    )
-                    source_data = {
-                        "launch_data_provider": "RocketLaunch.Live",
-                        "launch_info": launch_data,
-                        "weather": weather_data,
-                        "weather_analysis": weather_analysis
-                    }
+                prefetched = self._prefetched.pop(goal, None)
+                if prefetched is not None:
+                    print("Using launch research prefetched during planning...")
+                    launch_data, location, weather_data = await prefetched
                 else:
-                    research_summary = "Found a SpaceX launch but could not extract its location for weather analysis."
-                    source_data = {"launch_data_provider": "RocketLaunch.Live", "launch_info": launch_data}
+                    print("Conducting targeted launch research via RocketLaunch.Live...")
+                    launch_data, location, weather_data = await self._gather_launch_data()
+                
+                research_summary, source_data = self.summarize_launch(goal, launch_data, location, weather_data)
             else:
                 print("Conducting general research...")
                 research_summary = await self._general_research(goal, plan)
                 source_data = {"source": "Gemini LLM"}
 
             # CHANGED: Unified output structure
-            output = {
-                "data": {
+            output = AgentMessage(
+                data={
                     "research_summary": research_summary,
                     "source_data": source_data,
                 },
-                "context": input_data.get("context", {}), # Pass context through
-                "status": "completed"
-            }
+                context=input_data.get("context", {}), # Pass context through
+                status="completed"
+            )
             self.update_confidence(0.9) if research_summary else self.update_confidence(0.4)
             self.add_to_history(input_data, output)
             return output
@@ -90,15 +91,66 @@ class ResearchAgent(BaseAgent):
             print(f"Research agent error: {str(e)}")
             return self._create_error_output(f"An exception occurred: {e}")
 
-    def _create_error_output(self, error_message: str) -> Dict[str, Any]:
-        return {
-            "data": {
+    def _create_error_output(self, error_message: str) -> AgentMessage:
+        return AgentMessage(
+            data={
                 "research_summary": f"Error: {error_message}",
                 "source_data": {}
             },
-            "context": {"error": error_message},
-            "status": "error"
-        }
+            context={"error": error_message},
+            status="error"
+        )
+
+    def summarize_launch(
+        self,
+        goal: str,
+        launch_data: Dict[str, Any],
+        location: Optional[Dict[str, float]],
+        weather_data: Optional[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build the research summary and source data for fetched launch/weather data."""
+        if location:
+            weather_analysis = analyze_weather_impact(weather_data, launch_data)
+            
+            # CHANGED: Update this section to use the new field names from RocketLaunch.Live
+            mission_name = launch_data.get('name', 'N/A')
+            launch_time = launch_data.get('t0') or launch_data.get('win_open') or 'N/A'
+            
+            # Correctly access the nested pad and location names.
+            pad_object = launch_data.get("pad", {})
+            location_object = pad_object.get("location", {})
+            launch_site_name = location_object.get("name", "Unknown Site")
+            pad_name = pad_object.get("name", "Unknown Pad")
+
+            summary = (
+                f"Research on the next SpaceX launch for goal: '{goal}'.\n"
+                f"Mission: {mission_name}\n"
+                f"Scheduled Time (UTC): {launch_time}\n"
+                f"Launch Site: {launch_site_name} - {pad_name}\n"
+                f"Weather at site: {weather_analysis['conditions']['description']}.\n"
+                f"Potential weather impacts: {', '.join(weather_analysis['potential_impacts'])}"
+            )
+            # Raw payloads are stored once and referenced by every later stage.
+            source_data = {
+                "launch_data_provider": "RocketLaunch.Live",
+                "launch_info": payloads.put("launch", launch_data),
+                "weather": payloads.put("weather", weather_data),
+                "weather_analysis": weather_analysis
+            }
+        else:
+            summary = "Found a SpaceX launch but could not extract its location for weather analysis."
+            source_data = {"launch_data_provider": "RocketLaunch.Live", "launch_info": payloads.put("launch", launch_data)}
+        return summary, source_data
+
+    async def _gather_launch_data(self) -> Tuple[Dict[str, Any], Optional[Dict[str, float]], Optional[Dict[str, Any]]]:
+        """Fetch the next SpaceX launch, its coordinates and the weather there, holding one HTTP slot."""
+        async with resource_slot("http"):
+            launch_data = await get_spacex_launch()
+            location = await extract_launch_location(launch_data)
+            weather_data = None
+            if location:
+                weather_data = await get_weather(location["lat"], location["lon"])
+        return launch_data, location, weather_data
 
     async def _general_research(self, goal: str, plan: str) -> str:
         """Perform general research using Gemini."""
@@ -110,5 +162,5 @@ class ResearchAgent(BaseAgent):
         
         Provide a comprehensive summary of your findings.
         """
-        response = self.model.generate_content(prompt)
+        response = await router.generate(self.name, prompt)
         return response.text
\ No newline at end of file
@@ -2,19 +2,16 @@
 
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
-from utils.config import settings
-import google.generativeai as genai
-import json
+from utils.messages import AgentMessage, dumps
+from utils.model_router import router
 
 class SynthesisAgent(BaseAgent):
     """Agent responsible for synthesizing information into a final output."""
     
     def __init__(self):
         super().__init__("synthesis")
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
     
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, input_data: Dict[str, Any]) -> AgentMessage:
         """Process and synthesize the input data into a final output."""
         data_to_synthesize = input_data.get("data", {})
         context = input_data.get("context", {})
@@ -35,7 +32,7 @@ class SynthesisAgent(BaseAgent):
         User Goal: {goal}
 
         Available Data & Analysis:
-        {json.dumps(data_to_synthesize, indent=2)}
+        {dumps(data_to_synthesize, indent=True)}
 
         Synthesize all this information into a coherent, well-structured report. The report should include:
         1.  An Executive Summary.
@@ -46,12 +43,12 @@ class SynthesisAgent(BaseAgent):
         Present this as a single, formatted text output.
         """
         
-        response = self.model.generate_content(synthesis_prompt)
+        response = await router.generate(self.name, synthesis_prompt)
         synthesized_text = response.text
         
-        output = {
-            "data": {
-                # Pass through previous data
+        output = AgentMessage(
+            data={
+                # Pass through previous data (a shallow copy; payloads travel as references)
                 **data_to_synthesize,
                 # Add new synthesis data
                 "synthesized_output": synthesized_text,
@@ -59,9 +56,9 @@ class SynthesisAgent(BaseAgent):
                     "formatted_text": synthesized_text
                 }
             },
-            "context": context,
-            "status": "completed"
-        }
+            context=context,
+            status="completed"
+        )
         
         self.update_confidence(0.95)
         self.add_to_history(input_data, output)
@@ -69,18 +66,18 @@ class SynthesisAgent(BaseAgent):
         return output
     
     # CHANGED: The function now accepts and preserves the original context.
-    def _create_error_output(self, error_message: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_error_output(self, error_message: str, context: Dict[str, Any]) -> AgentMessage:
         """Create an error output with appropriate structure, preserving context."""
         self.update_confidence(0.1)
 
         error_context = context.copy()
         error_context["error"] = error_message
 
-        return {
-            "data": {
+        return AgentMessage(
+            data={
                 "synthesized_output": f"Error: {error_message}",
                 "formatted_output": {"formatted_text": f"Error: {error_message}"}
             },
-            "context": error_context,
-            "status": "error"
-        }
\ No newline at end of file
+            context=error_context,
+            status="error"
+        )
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Compare tail latency with and without hedged LLM requests.
+
+The real model is replaced with a simulated one whose latency is mostly fast
+with an occasional long stall, which is the shape hedging is meant to cut.
+
+    python -m benchmarks.bench_hedging --requests 400
+"""
+
+import argparse
+import asyncio
+import random
+from types import SimpleNamespace
+from utils.config import settings
+from utils.model_router import LatencyTracker, ModelRouter
+
+
+class SimulatedModel:
+    """Stands in for a GenerativeModel with a heavy-tailed latency distribution."""
+
+    def __init__(self, base: float, tail: float, tail_rate: float, rng: random.Random):
+        self.base = base
+        self.tail = tail
+        self.tail_rate = tail_rate
+        self.rng = rng
+
+    async def generate_content_async(self, prompt: str):
+        delay = self.rng.uniform(0.5, 1.5) * self.base
+        if self.rng.random() < self.tail_rate:
+            delay += self.tail
+        await asyncio.sleep(delay)
+        return SimpleNamespace(text="ok")
+
+
+async def run(hedge: bool, requests: int, concurrency: int, seed: int) -> LatencyTracker:
+    router = ModelRouter()
+    model = SimulatedModel(base=0.02, tail=0.5, tail_rate=0.05, rng=random.Random(seed))
+    router._get_model = lambda name: model
+
+    # Warm the attempt window so the hedge delay comes from measured p95.
+    for _ in range(settings.HEDGE_MIN_SAMPLES):
+        await router.generate("planner", "warmup", hedge=False)
+    router.observed_latency.clear()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call():
+        async with semaphore:
+            await router.generate("planner", "benchmark", hedge=hedge)
+
+    await asyncio.gather(*(one_call() for _ in range(requests)))
+    tracker = router.observed_latency[router.select_model("planner", "benchmark")]
+    print(
+        f"hedge={hedge!s:5}  p50={tracker.percentile(50) * 1000:7.1f}ms  "
+        f"p95={tracker.percentile(95) * 1000:7.1f}ms  p99={tracker.percentile(99) * 1000:7.1f}ms  "
+        f"hedges fired={router.hedges_fired} won={router.hedges_won}"
+    )
+    return tracker
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Hedged request benchmark")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    baseline = await run(False, args.requests, args.concurrency, args.seed)
+    hedged = await run(True, args.requests, args.concurrency, args.seed)
+    improvement = 1 - hedged.percentile(99) / baseline.percentile(99)
+    print(f"p99 improvement: {improvement:.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Measure per-stage allocations and raw-payload copies through the agent pipeline.
+
+The LLM and the launch/weather APIs are replaced with canned responses so the
+numbers reflect only how messages move between agents.
+
+    python -m benchmarks.bench_payloads --payload-kb 64
+"""
+
+import argparse
+import asyncio
+import json
+import tracemalloc
+from types import SimpleNamespace
+from main import MultiAgentOrchestrator
+from utils.config import settings
+from utils.messages import dumps, orjson, payloads
+from utils.model_router import router
+
+GOAL = "Find the next SpaceX launch and check the weather at the launch site"
+
+
+def make_payloads(payload_kb: int):
+    launch = {
+        "id": 1,
+        "name": "Starlink Group 10-1",
+        "t0": "2030-01-01T00:00:00Z",
+        "provider": {"name": "SpaceX"},
+        "pad": {"name": "SLC-40", "location": {"id": 61, "name": "Cape Canaveral SFS"}},
+        "launch_description": "x" * (payload_kb * 1024),
+        "tags": [{"id": i, "text": f"tag-{i}"} for i in range(50)],
+    }
+    weather = {
+        "weather": [{"description": "scattered clouds"}],
+        "main": {"temp": 24.1, "humidity": 70},
+        "wind": {"speed": 5.2},
+        "clouds": {"all": 40},
+        "hourly": [{"dt": i, "temp": 20 + i % 5} for i in range(48)],
+    }
+    return launch, weather
+
+
+prompt_sizes = {}
+
+
+async def fake_generate(agent_name: str, prompt: str, hedge=None):
+    prompt_sizes.setdefault(agent_name, []).append(len(prompt))
+    if agent_name == "planner" and "Original Goal" in prompt:
+        return SimpleNamespace(text="0.9")
+    if agent_name == "planner":
+        return SimpleNamespace(text=json.dumps({"plan": "Research, analyze, synthesize.", "agent_order": ["research", "analysis", "synthesis"]}))
+    if agent_name == "analysis":
+        return SimpleNamespace(text=json.dumps({"analysis_text": "Weather is acceptable.", "insights": ["Winds are low."], "recommendations": ["Proceed."]}))
+    return SimpleNamespace(text="Executive Summary: launch is likely on time.")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Inter-agent payload benchmark")
+    parser.add_argument("--payload-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    settings.RESULT_STORE_PATH = ""
+    router.generate = fake_generate
+    launch, weather = make_payloads(args.payload_kb)
+
+    orchestrator = MultiAgentOrchestrator()
+
+    async def fake_gather():
+        return launch, {"lat": 28.5, "lon": -80.6}, weather
+
+    orchestrator.research_agent._gather_launch_data = fake_gather
+
+    # Wrap each agent so allocations are attributed to the stage that made them.
+    stage_stats = {}
+    for agent in (orchestrator.planner, orchestrator.research_agent, orchestrator.analysis_agent, orchestrator.synthesis_agent):
+        original = agent.process
+
+        async def measured(input_data, _original=original, _name=agent.name):
+            tracemalloc.reset_peak()
+            current_before, _ = tracemalloc.get_traced_memory()
+            resolved_before = payloads.stats["resolved"]
+            output = await _original(input_data)
+            current_after, peak = tracemalloc.get_traced_memory()
+            stage_stats[_name] = {
+                "peak_kb": (peak - current_before) / 1024,
+                "retained_kb": (current_after - current_before) / 1024,
+                "payload_copies": payloads.stats["resolved"] - resolved_before,
+            }
+            return output
+
+        agent.process = measured
+
+    tracemalloc.start()
+    result = await orchestrator.execute(GOAL, reuse=False)
+    tracemalloc.stop()
+
+    print(f"raw payload size: {len(json.dumps(launch)) / 1024:.1f} KB launch, {len(json.dumps(weather)) / 1024:.1f} KB weather")
+    print(f"{'stage':<10} {'peak alloc':>12} {'retained':>12} {'payload copies':>15} {'prompt chars':>13}")
+    for name, stats in stage_stats.items():
+        sizes = prompt_sizes.get(name, [0])
+        print(f"{name:<10} {stats['peak_kb']:>9.1f} KB {stats['retained_kb']:>9.1f} KB "
+              f"{stats['payload_copies']:>15} {sizes[0]:>13}")
+    print(f"evaluation prompt chars: {prompt_sizes['planner'][-1]}")
+    print(f"payload store: {payloads.stats}")
+
+    serializer = "orjson" if orjson is not None else "json"
+    final_output = result["final_output"]
+    print(f"final message serialized with {serializer}: {len(dumps(final_output)) / 1024:.1f} KB "
+          f"(refs unresolved: {len(dumps(final_output, resolve_payloads=False)) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+Recall and latency of the near-duplicate goal index at scale.
+
+Stores synthetic goals, then queries reworded variants of stored goals and
+compares the index's answers with a brute-force Jaccard scan. Half of the
+queries also drop or add a content word, so recall is reported separately for
+exact matches (Jaccard 1.0) and near matches (threshold <= Jaccard < 1.0),
+which are the ones LSH banding can miss.
+
+    python -m benchmarks.bench_similarity --goals 100000 --queries 200
+"""
+
+import argparse
+import random
+import time
+from utils.config import settings
+from utils.similarity import GoalIndex, goal_shingles, jaccard
+
+SUBJECTS = ["spacex", "nasa", "rocket lab", "blue origin", "ula", "esa", "isro", "arianespace"]
+TOPICS = ["launch", "landing", "mission", "payload", "booster", "satellite", "crew", "rover"]
+ASPECTS = ["weather", "delay", "schedule", "cost", "risk", "status", "trajectory", "window"]
+EXTRAS = ["next", "upcoming", "latest", "today", "tomorrow", "orbital", "lunar", "mars", "florida", "texas"]
+FILLERS = ["for", "the", "of", "show me", "tell me", "please find", "check"]
+
+
+def make_goal(rng: random.Random) -> str:
+    words = [rng.choice(SUBJECTS), rng.choice(TOPICS), rng.choice(ASPECTS)]
+    words += rng.sample(EXTRAS, rng.randint(1, 3))
+    words.append(str(rng.randint(1, 500)))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def reword(goal: str, rng: random.Random) -> str:
+    """Same content words, different order and filler."""
+    words = goal.split()
+    rng.shuffle(words)
+    words.insert(rng.randint(0, len(words)), rng.choice(FILLERS))
+    return " ".join(words)
+
+
+def perturb(goal: str, rng: random.Random) -> str:
+    """Drop or add one content word; for these goal lengths Jaccard stays >= 0.8."""
+    words = goal.split()
+    if rng.random() < 0.5 and len(words) > 4:
+        words.pop(rng.randrange(len(words)))
+    else:
+        words.append(rng.choice([word for word in EXTRAS + ASPECTS if word not in words]))
+    return " ".join(words)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate goal index benchmark")
+    parser.add_argument("--goals", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=settings.SIMILAR_GOAL_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    goals = [make_goal(rng) for _ in range(args.goals)]
+
+    index = GoalIndex()
+    start = time.perf_counter()
+    for run_id, goal in enumerate(goals):
+        index.add(run_id, goal)
+    build_seconds = time.perf_counter() - start
+    print(f"indexed {len(index)} goals in {build_seconds:.1f}s ({len(index) / build_seconds:,.0f} goals/s)")
+
+    stored = [goal_shingles(goal) for goal in goals]
+    latencies = []
+    brute_latencies = []
+    expected_total = {"exact": 0, "near": 0}
+    found_total = {"exact": 0, "near": 0}
+    for query_number in range(args.queries):
+        source = rng.choice(goals)
+        query = reword(perturb(source, rng) if query_number % 2 else source, rng)
+
+        start = time.perf_counter()
+        found = {key for key, _ in index.query(query, args.threshold, limit=len(goals))}
+        latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        shingles = goal_shingles(query)
+        expected = {}
+        for key, other in enumerate(stored):
+            similarity = jaccard(shingles, other)
+            if similarity >= args.threshold:
+                expected[key] = similarity
+        brute_latencies.append(time.perf_counter() - start)
+
+        for key, similarity in expected.items():
+            kind = "exact" if similarity == 1.0 else "near"
+            expected_total[kind] += 1
+            found_total[kind] += key in found
+
+    for kind, label in (("exact", "Jaccard = 1.0"), ("near", f"{args.threshold} <= Jaccard < 1.0")):
+        print(f"recall at {label}: {found_total[kind] / max(expected_total[kind], 1):.4f} "
+              f"({found_total[kind]}/{expected_total[kind]} matches)")
+    print(f"index query:  p50 {percentile(latencies, 50) * 1000:.2f}ms  p99 {percentile(latencies, 99) * 1000:.2f}ms")
+    print(f"brute force:  p50 {percentile(brute_latencies, 50) * 1000:.2f}ms  p99 {percentile(brute_latencies, 99) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,47 +2,177 @@
 
 import asyncio
 import argparse
-from typing import Dict, Any, List
+import json
+import sys
+import time
+from collections.abc import Mapping
+from typing import Dict, Any, AsyncIterator, List, Optional
+import aiohttp
 from agents.planner import PlannerAgent
 from agents.research_agent import ResearchAgent
 from agents.analysis_agent import AnalysisAgent
 from agents.synthesis_agent import SynthesisAgent
 from utils.config import settings
+from utils.messages import AgentMessage
+from utils.model_router import router
+from utils.profiling import SamplingProfiler, code_tags
+from utils.result_store import ResultStore
+from utils.scheduler import GoalScheduler, StagePool, using_pools
+from utils.similarity import GoalIndex
+from utils.watch import LaunchWatcher
 
 class MultiAgentOrchestrator:
     """Orchestrates the execution of multiple agents to achieve a goal."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        store: Optional[ResultStore] = None,
+        goal_index: Optional[GoalIndex] = None,
+        pools: Optional[Dict[str, StagePool]] = None
+    ):
+        """
+        The run store, goal index and stage pools can be shared between
+        orchestrators; agents and iteration state are always per instance.
+        """
         self.planner = PlannerAgent()
         self.research_agent = ResearchAgent()
         self.analysis_agent = AnalysisAgent()
         self.synthesis_agent = SynthesisAgent()
         self.iteration_count = 0
+        self.pools = pools or {}
+        if store is None and settings.RESULT_STORE_PATH:
+            store = ResultStore()
+        self.store = store
+        if goal_index is None:
+            goal_index = GoalIndex()
+            if self.store is not None:
+                for run_id, past_goal in self.store.recent_goals(settings.SIMILAR_GOAL_INDEX_SIZE):
+                    goal_index.add(run_id, past_goal)
+        self.goal_index = goal_index
     
-    async def execute(self, goal: str) -> Dict[str, Any]:
-        """Execute the multi-agent system to achieve the given goal."""
+    async def execute(self, goal: str, reuse: bool = False, profile: bool = False) -> Dict[str, Any]:
+        """
+        Execute the multi-agent system to achieve the given goal. Every run is
+        stored; with reuse=True a recent successful run of the goal is returned
+        instead, which can be stale for time-sensitive goals.
+        """
+        if not profile:
+            return await self._execute(goal, reuse)
+
+        profiler = SamplingProfiler(code_tags({
+            # Listed first so the planner's evaluation method is tagged as evaluation.
+            "evaluation": [self._evaluate_final_output, self.planner.evaluate_goal_satisfaction],
+            "planner": [self.planner],
+            "research": [self.research_agent],
+            "analysis": [self.analysis_agent],
+            "synthesis": [self.synthesis_agent],
+        }))
+        # Only samples under this coroutine's frame, or in tasks the run creates, count towards the run.
+        profiler.attach(sys._getframe())
+        profiler.start()
+        try:
+            result = await self._execute(goal, reuse)
+        finally:
+            profiler.stop()
+        result["profile"] = {
+            "files": profiler.export(goal),
+            "seconds_by_agent": profiler.summary()
+        }
+        return result
+
+    async def _execute(self, goal: str, reuse: bool) -> Dict[str, Any]:
         print(f"\nProcessing goal: {goal}")
-        
+
+        if reuse and self.store is not None:
+            previous_run = self.store.find_reusable(
+                goal, settings.RESULT_REUSE_MAX_AGE, settings.CONFIDENCE_THRESHOLD
+            )
+            if previous_run:
+                print(f"Reusing stored run {previous_run['id']} for this goal")
+                return self._result_from_run(previous_run)
+
+        reused_plan = None
+        if reuse and self.store is not None:
+            similar_run, reused_plan = self._find_similar_run(goal)
+            if similar_run:
+                print(f"Reusing stored run {similar_run['id']} for the similar goal: {similar_run['goal']}")
+                return self._result_from_run(similar_run)
+
+        start = time.perf_counter()
+        # LLM calls and HTTP fetches made by this run, including the tasks it
+        # starts, hold slots in the shared pools.
+        with using_pools(self.pools):
+            # Plan-independent launch/weather fetches run while the planner thinks.
+            if self.research_agent.start_prefetch(goal):
+                print("Speculatively prefetching launch research...")
+            try:
+                result = await self._execute_plan(goal, reused_plan)
+            finally:
+                # No-op if research consumed the prefetch; cancels it otherwise.
+                self.research_agent.discard_prefetch(goal)
+        result["timings"]["total"] = time.perf_counter() - start
+
+        if self.store is not None:
+            result["run_id"] = self.store.save_run(goal, result)
+            self.goal_index.add(result["run_id"], goal)
+        return result
+
+    def _find_similar_run(self, goal: str) -> tuple:
+        """
+        Look up near-duplicate past goals. Returns (run, None) when a run with the
+        same content words is fresh enough to reuse, (None, plan) when only the
+        plan of a similar run is, and (None, None) otherwise.
+        """
+        now = time.time()
+        reusable_plan = None
+        for run_id, similarity in self.goal_index.query(goal, settings.SIMILAR_GOAL_THRESHOLD):
+            run = self.store.get(run_id)
+            if not run or (run["score"] or 0.0) < settings.CONFIDENCE_THRESHOLD:
+                continue
+            age = now - run["created_at"]
+            if similarity >= settings.SIMILAR_RESULT_THRESHOLD and age <= settings.RESULT_REUSE_MAX_AGE:
+                return run, None
+            if reusable_plan is None and age <= settings.SIMILAR_PLAN_MAX_AGE and run["agent_order"]:
+                print(f"Reusing the plan of run {run_id} (similarity {similarity:.2f})")
+                reusable_plan = AgentMessage(
+                    data={"plan": run["plan"]},
+                    context={"goal": goal},
+                    status="planned",
+                    agent_order=run["agent_order"]
+                )
+        return None, reusable_plan
+
+    async def _execute_plan(self, goal: str, plan_result: Optional[AgentMessage] = None) -> Dict[str, Any]:
+        """Plan (unless a reused plan is given), run the planned agents and evaluate the result."""
+        timings: Dict[str, float] = {}
+
         # Step 1: Planning
-        plan_result = await self.planner.process({"goal": goal})
-        print("\nPlanning phase completed")
+        if plan_result is None:
+            stage_start = time.perf_counter()
+            plan_result = await self.planner.process({"goal": goal})
+            timings["planning"] = time.perf_counter() - stage_start
+            print("\nPlanning phase completed")
         
         # Step 2: Execute agents in order
         agent_order = plan_result.get("agent_order", [])
+        if "research" not in (name.lower().strip() for name in agent_order):
+            self.research_agent.discard_prefetch(goal)
         
         # CHANGED: The initial 'current_data' now directly uses the planner's output,
         # ensuring the plan is passed along correctly.
-        current_data = {
-            "data": plan_result.get("data", {}),
-            "context": {
+        current_data = AgentMessage(
+            data=plan_result.get("data", {}),
+            context={
                 "goal": goal,
-            }
-        }
+            },
+            status="planned"
+        )
         
         for agent_name in agent_order:
             print(f"\nExecuting {agent_name} agent...")
             agent = self._get_agent(agent_name)
             if agent:
+                stage_start = time.perf_counter()
                 # The output of one agent becomes the direct input for the next.
                 current_data = await agent.process(current_data)
                 
@@ -51,19 +181,83 @@ class MultiAgentOrchestrator:
                     self.iteration_count += 1
                     print(f"\nIteration {self.iteration_count} for {agent_name} agent...")
                     current_data = await agent.process(current_data)
+                timings[agent.name] = timings.get(agent.name, 0.0) + time.perf_counter() - stage_start
             else:
                 print(f"Warning: Unknown agent {agent_name}")
         
         # Step 3: Final evaluation
+        stage_start = time.perf_counter()
         final_evaluation = await self._evaluate_final_output(current_data, goal)
+        timings["evaluation"] = time.perf_counter() - stage_start
         
         return {
             "final_output": current_data,
             "evaluation": final_evaluation,
             "iterations": self.iteration_count,
-            "agent_order": agent_order
+            "agent_order": agent_order,
+            "plan": plan_result.get("data", {}).get("plan", ""),
+            "timings": timings
+        }
+
+    @staticmethod
+    def _result_from_run(run: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild an execute() result from a stored run."""
+        evaluation = run.get("evaluation") or {}
+        return {
+            "final_output": run.get("final_output") or {},
+            "evaluation": evaluation,
+            "iterations": evaluation.get("iterations_required", 0),
+            "agent_order": run.get("agent_order") or [],
+            "plan": run.get("plan", ""),
+            "timings": run.get("timings") or {},
+            "run_id": run["id"],
+            "reused": True
         }
     
+    async def watch(self, goal: str, interval: float, max_polls: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Poll the launch and weather sources and re-run analysis/synthesis only
+        when a material field changes, yielding one update per change.
+        """
+        watcher = LaunchWatcher()
+        polls = 0
+        async with aiohttp.ClientSession() as session:
+            while max_polls is None or polls < max_polls:
+                polls += 1
+                try:
+                    snapshot = await watcher.poll(session)
+                except Exception as e:
+                    print(f"Watch poll {polls} failed: {e}")
+                    snapshot = None
+
+                if snapshot and snapshot["changes"]:
+                    yield await self._process_watch_update(goal, snapshot, polls)
+                elif snapshot:
+                    print(f"Poll {polls}: no material change")
+
+                if max_polls is None or polls < max_polls:
+                    await asyncio.sleep(interval)
+
+    async def _process_watch_update(self, goal: str, snapshot: Dict[str, Any], poll: int) -> Dict[str, Any]:
+        """Turn a changed launch/weather snapshot into a fresh report."""
+        start = time.perf_counter()
+        research_summary, source_data = self.research_agent.summarize_launch(
+            goal, snapshot["launch"], snapshot["location"], snapshot["weather"]
+        )
+        current_data = AgentMessage(
+            data={"research_summary": research_summary, "source_data": source_data},
+            context={"goal": goal},
+            status="completed"
+        )
+        current_data = await self.analysis_agent.process(current_data)
+        current_data = await self.synthesis_agent.process(current_data)
+        return {
+            "poll": poll,
+            "changes": snapshot["changes"],
+            "final_output": current_data,
+            "timings": {"total": time.perf_counter() - start}
+        }
+
     def _get_agent(self, agent_name: str):
         """Get the appropriate agent instance based on name."""
         agents = {
@@ -87,29 +281,121 @@ class MultiAgentOrchestrator:
             "success": satisfaction_score >= settings.CONFIDENCE_THRESHOLD
         }
 
+async def watch(orchestrator: MultiAgentOrchestrator, goal: str, interval: float) -> None:
+    if not ResearchAgent.is_spacex_query(goal):
+        print("Watch mode only supports SpaceX launch goals.")
+        return
+
+    print(f"Watching launch and weather data every {interval:.0f}s...")
+    async for update in orchestrator.watch(goal, interval):
+        print(f"\n=== Update (poll {update['poll']}) ===")
+        for field, (old, new) in update["changes"].items():
+            print(f"{field}: {old} -> {new}")
+        final_data = update["final_output"].get("data", {})
+        print(final_data.get("synthesized_output", "No final synthesis available."))
+
+async def run_goals_file(path: str, tenant_weights: Dict[str, float], reuse: bool, profile: bool = False) -> None:
+    with open(path) as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+
+    # Each goal gets its own agents; the run store, goal index and stage pools are shared.
+    shared = MultiAgentOrchestrator()
+
+    async def run_goal(goal: str, reuse: bool = False, profile: bool = False) -> Dict[str, Any]:
+        orchestrator = MultiAgentOrchestrator(store=shared.store, goal_index=shared.goal_index, pools=scheduler.pools)
+        return await orchestrator.execute(goal, reuse=reuse, profile=profile)
+
+    scheduler = GoalScheduler(run_goal, tenant_weights=tenant_weights)
+
+    async def submit(job: Dict[str, Any]) -> None:
+        tenant = job.get("tenant", "default")
+        try:
+            result = await scheduler.submit(
+                job["goal"], tenant=tenant, priority=job.get("priority", "normal"),
+                reuse=reuse, profile=job.get("profile", profile)
+            )
+            print(f"\n[{tenant}] {job['goal']}: satisfaction {result['evaluation']['goal_satisfaction']:.2f}")
+            if "profile" in result:
+                print(f"[{tenant}] profile: {result['profile']['files']['speedscope']}")
+        except Exception as e:
+            print(f"\n[{tenant}] {job['goal']}: failed ({e})")
+
+    await asyncio.gather(*(submit(job) for job in jobs))
+
+    metrics = scheduler.metrics()
+    print("\n=== Scheduler ===")
+    print(f"Completed: {metrics['completed']}, failed: {metrics['failed']}")
+    for priority, wait in metrics["queue_wait"].items():
+        if wait["count"]:
+            print(f"{priority}: {wait['count']} goals, queue wait p50 {wait['p50']:.2f}s, p95 {wait['p95']:.2f}s")
+    for name, pool in metrics["pools"].items():
+        wait = pool["wait"]
+        if wait["count"]:
+            print(f"{name} pool (limit {pool['limit']}): {wait['count']} calls, wait p95 {wait['p95']:.2f}s")
+
 async def main():
     parser = argparse.ArgumentParser(description="Multi-Agent AI System")
-    parser.add_argument("--goal", required=True, help="The goal to achieve")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--goal", help="The goal to achieve")
+    source.add_argument("--goals-file", help="JSON lines of {\"goal\", \"tenant\", \"priority\"} to run concurrently through the scheduler")
+    parser.add_argument("--tenant-weight", action="append", default=[], metavar="TENANT=WEIGHT", help="Fair-share weight for a tenant (repeatable)")
+    parser.add_argument("--watch", action="store_true", help="Keep polling launch/weather data and report only material changes")
+    parser.add_argument("--interval", type=float, default=settings.WATCH_INTERVAL, help="Seconds between watch polls")
+    parser.add_argument("--reuse", action="store_true", help="Return a recent successful stored run of the same goal instead of running the agents")
+    parser.add_argument("--profile", action="store_true", help="Sample the run's stacks and write collapsed-stack and speedscope flamegraph files")
+    parser.add_argument("--hedge", action="store_true", help="Fire hedged duplicate LLM requests after the p95 delay")
     args = parser.parse_args()
+    if args.hedge:
+        settings.HEDGE_ENABLED = True
     
+    if args.goals_file:
+        weights = {}
+        for entry in args.tenant_weight:
+            tenant, _, weight = entry.partition("=")
+            weights[tenant] = float(weight)
+        await run_goals_file(args.goals_file, weights, reuse=args.reuse, profile=args.profile)
+        return
+
     orchestrator = MultiAgentOrchestrator()
-    result = await orchestrator.execute(args.goal)
+    if args.watch:
+        await watch(orchestrator, args.goal, args.interval)
+        return
+
+    result = await orchestrator.execute(args.goal, reuse=args.reuse, profile=args.profile)
     
     print("\n=== Final Results ===")
     print(f"Goal Satisfaction: {result['evaluation']['goal_satisfaction']:.2f}")
     print(f"Iterations Required: {result['iterations']}")
     print(f"Success: {result['evaluation']['success']}")
+    if result.get("reused"):
+        print(f"Reused stored run {result['run_id']} (run without --reuse for a live answer)")
+    elif result.get("run_id") is not None:
+        print(f"Stored as run {result['run_id']}")
+    timings = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result.get("timings", {}).items())
+    print(f"Timings: {timings}")
+    if "profile" in result:
+        sampled = ", ".join(f"{tag} {seconds:.2f}s" for tag, seconds in result["profile"]["seconds_by_agent"].items())
+        print(f"Profile (busy event-loop wall time): {sampled or 'no busy samples'}")
+        print(f"Flamegraph files: {result['profile']['files']['collapsed']}, {result['profile']['files']['speedscope']}")
     print("\nFinal Output:")
     
     # CHANGED: More robustly parse the final output
     final_data = result.get('final_output', {}).get('data', {})
     formatted_output = final_data.get('formatted_output', {})
-    if isinstance(formatted_output, dict):
+    if isinstance(formatted_output, Mapping):
         print(formatted_output.get('formatted_text', 'No formatted output available.'))
-    elif isinstance(final_data, dict):
+    elif isinstance(final_data, Mapping):
         print(final_data.get('synthesized_output', 'No final synthesis available.'))
     else:
         print(final_data)
 
+    print("\n=== Model Latency ===")
+    metrics = router.metrics()
+    for model_name, stats in metrics["models"].items():
+        observed = stats["observed"]
+        print(f"{model_name}: {observed['count']} calls, p50 {observed['p50']:.2f}s, p99 {observed['p99']:.2f}s")
+    if settings.HEDGE_ENABLED:
+        print(f"Hedges fired: {metrics['hedges_fired']}, won: {metrics['hedges_won']}, skipped for a busy pool: {metrics['hedges_skipped']}")
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
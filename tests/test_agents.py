@@ -7,6 +7,7 @@ from agents.research_agent import ResearchAgent
 from agents.analysis_agent import AnalysisAgent
 from agents.synthesis_agent import SynthesisAgent
 from main import MultiAgentOrchestrator
+from utils.config import settings
 
 # A realistic goal for testing
 TEST_GOAL = "Analyze the potential impact of AI on healthcare in the next decade"
@@ -92,8 +93,10 @@ async def test_synthesis_agent():
     assert result["status"] == "completed"
 
 @pytest.mark.asyncio
-async def test_full_system_orchestration():
+async def test_full_system_orchestration(tmp_path, monkeypatch):
     """Test the complete multi-agent system from goal to final output."""
+    # Keep the run store out of the working directory so no earlier run can answer for this one.
+    monkeypatch.setattr(settings, "RESULT_STORE_PATH", str(tmp_path / "runs.db"))
     orchestrator = MultiAgentOrchestrator()
     
     result = await orchestrator.execute(TEST_GOAL)
@@ -109,4 +112,29 @@ async def test_full_system_orchestration():
     assert evaluation["goal_satisfaction"] <= 1.0
     
     final_output_data = result.get("final_output", {}).get("data", {})
-    assert "synthesized_output" in final_output_data or "analysis" in final_output_data
\ No newline at end of file
+    assert "synthesized_output" in final_output_data or "analysis" in final_output_data
+
+
+@pytest.mark.asyncio
+async def test_research_agent_uses_prefetched_launch_data():
+    """Test that launch data prefetched during planning is consumed instead of refetched."""
+    research = ResearchAgent()
+    goal = "Find the next SpaceX launch and check the weather"
+    launch = {"name": "Starlink", "t0": "2030-01-01T00:00Z", "pad": {"name": "SLC-40", "location": {"name": "Cape Canaveral"}}}
+    weather = {"weather": [{"description": "clear sky"}], "main": {"temp": 22}, "wind": {"speed": 3}, "clouds": {"all": 5}}
+    calls = []
+
+    async def fake_gather():
+        calls.append(goal)
+        return launch, {"lat": 28.5, "lon": -80.6}, weather
+
+    research._gather_launch_data = fake_gather
+    assert research.start_prefetch(goal)
+    assert not research.start_prefetch(TEST_GOAL)
+
+    result = await research.process({"data": {"plan": ""}, "context": {"goal": goal}})
+
+    assert len(calls) == 1
+    assert goal not in research._prefetched
+    assert "Starlink" in result["data"]["research_summary"]
+    assert result["status"] == "completed"
@@ -0,0 +1,68 @@
+
+
+import json
+import pytest
+from utils.messages import AgentMessage, PayloadEvictedError, PayloadStore, dumps, payloads
+
+def test_agent_message_is_immutable_mapping():
+    """Test that messages index like the old dicts but reject mutation."""
+    message = AgentMessage(data={"plan": "p"}, context={"goal": "g"}, status="planned", agent_order=["research"])
+
+    assert message["data"]["plan"] == "p"
+    assert message.get("agent_order") == ["research"]
+    assert "agent_order" in message and "missing" not in message
+    assert "agent_order" not in AgentMessage(data={}, context={}, status="completed")
+    with pytest.raises(AttributeError):
+        message.status = "error"
+
+def test_agent_message_freezes_data_and_context():
+    """Test that the sender's dicts are copied and the message's views reject writes."""
+    data = {"plan": "p"}
+    order = ["research"]
+    message = AgentMessage(data=data, context={"goal": "g"}, status="planned", agent_order=order)
+    data["plan"] = "changed"
+    order.append("synthesis")
+    message["agent_order"].append("analysis")
+
+    assert message["data"]["plan"] == "p"
+    assert message["agent_order"] == ["research"]
+    with pytest.raises(TypeError):
+        message["data"]["plan"] = "q"
+    with pytest.raises(TypeError):
+        message.context["goal"] = "h"
+
+def test_payload_store_deduplicates_and_evicts():
+    """Test that a payload is stored once and the oldest blobs are evicted."""
+    store = PayloadStore(max_blobs=2)
+    launch = {"name": "Starlink"}
+
+    ref = store.put("launch", launch)
+    assert store.put("launch", launch) == ref
+    assert store.stats["deduplicated"] == 1
+
+    store.put("weather", {"temp": 20})
+    store.put("weather", {"temp": 21})
+    assert store.get(ref) is None
+    assert store.stats["evicted"] == 1
+
+def test_dumps_resolves_payload_refs_at_the_boundary():
+    """Test that refs serialize to their payloads, or placeholders when unresolved."""
+    ref = payloads.put("launch", {"name": "Starlink"})
+    message = AgentMessage(data={"source_data": {"launch_info": ref}}, context={}, status="completed")
+
+    resolved = json.loads(dumps(message))
+    unresolved = json.loads(dumps(message, resolve_payloads=False))
+
+    assert resolved["data"]["source_data"]["launch_info"] == {"name": "Starlink"}
+    assert unresolved["data"]["source_data"]["launch_info"] == {"$ref": f"launch:{ref.blob_id}"}
+
+def test_dumps_raises_for_evicted_payload():
+    """Test that an evicted ref fails loudly instead of serializing as a placeholder."""
+    ref = payloads.put("launch", {"name": "Starlink"})
+    message = AgentMessage(data={"launch_info": ref}, context={}, status="completed")
+    for _ in range(payloads.max_blobs):
+        payloads.put("weather", {})
+
+    with pytest.raises(PayloadEvictedError):
+        dumps(message)
+    assert json.loads(dumps(message, resolve_payloads=False))["data"]["launch_info"] == {"$ref": f"launch:{ref.blob_id}"}
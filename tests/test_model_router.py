@@ -0,0 +1,106 @@
+
+
+import pytest
+import asyncio
+from types import SimpleNamespace
+from utils.config import settings
+from utils.model_router import ModelRouter, LatencyTracker
+from utils.scheduler import StagePool, using_pools
+
+class FakeModel:
+    """Returns after a scripted delay per call; later calls are fast."""
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def generate_content_async(self, prompt):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        call = self.calls
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(text=f"call {call}")
+
+def test_latency_tracker_percentiles():
+    """Test rounded-index percentiles over the rolling window."""
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(99) is None
+    for value in range(1, 101):
+        tracker.record(float(value))
+    assert tracker.percentile(50) == 51.0
+    assert tracker.percentile(99) == 99.0
+
+def test_model_selection_by_agent_and_prompt_size():
+    """Test that synthesis and oversized prompts are routed to the large tier."""
+    router = ModelRouter()
+    assert router.select_model("planner", "short") == settings.FAST_MODEL
+    assert router.select_model("synthesis", "short") == settings.LARGE_MODEL
+    assert router.select_model("analysis", "x" * (settings.LARGE_PROMPT_CHARS + 1)) == settings.LARGE_MODEL
+
+@pytest.mark.asyncio
+async def test_hedged_request_returns_faster_duplicate():
+    """Test that a stalled primary is beaten by the hedged duplicate and cancelled."""
+    router = ModelRouter()
+    model = FakeModel([1.0, 0.01])
+    router._get_model = lambda name: model
+    router.hedge_delay = lambda name: 0.02
+
+    response = await asyncio.wait_for(router.generate("planner", "goal", hedge=True), timeout=0.5)
+
+    assert response.text == "call 2"
+    assert router.hedges_fired == 1
+    assert router.hedges_won == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_hedge_loser_is_recorded_as_lower_bound():
+    """Test that the slow primary cancelled by a hedge still counts towards the delay window."""
+    router = ModelRouter()
+    model = FakeModel([1.0, 0.01])
+    router._get_model = lambda name: model
+    router.hedge_delay = lambda name: 0.05
+
+    await router.generate("planner", "goal", hedge=True)
+    await asyncio.sleep(0)
+
+    samples = sorted(router.attempt_latency[settings.FAST_MODEL].samples)
+    assert len(samples) == 2
+    assert samples[-1] >= 0.05
+
+@pytest.mark.asyncio
+async def test_generate_holds_an_llm_pool_slot():
+    """Test that model calls made while a goal's pools are active are limited by the LLM pool."""
+    router = ModelRouter()
+    router._get_model = lambda name: FakeModel([0.01])
+    pools = {"llm": StagePool("llm", 1)}
+
+    with using_pools(pools):
+        await asyncio.gather(*(router.generate("analysis", "data", hedge=False) for _ in range(3)))
+
+    wait = pools["llm"].metrics()["wait"]
+    assert wait["count"] == 3
+    assert wait["p99"] >= 0.015
+
+@pytest.mark.asyncio
+async def test_hedged_duplicates_hold_their_own_llm_slot():
+    """Test that hedging never exceeds the LLM pool and is skipped while other calls wait."""
+    router = ModelRouter()
+    model = FakeModel([0.1, 0.01])
+    router._get_model = lambda name: model
+    router.hedge_delay = lambda name: 0.02
+    pools = {"llm": StagePool("llm", 1)}
+
+    with using_pools(pools):
+        hedged = asyncio.ensure_future(router.generate("planner", "goal", hedge=True))
+        await asyncio.sleep(0)
+        plain = asyncio.ensure_future(router.generate("analysis", "data", hedge=False))
+        await asyncio.gather(hedged, plain)
+
+    assert model.peak_in_flight == 1
+    assert router.hedges_skipped == 1
+    assert router.hedges_fired == 0
@@ -0,0 +1,117 @@
+
+
+import json
+import sys
+import time
+import pytest
+import asyncio
+from utils.profiling import SamplingProfiler, code_tags
+
+class BusyAgent:
+    async def process(self):
+        deadline = time.perf_counter() + 0.2
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        await asyncio.sleep(0)
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+async def untagged_work():
+    spin(0.2)
+    await asyncio.sleep(0)
+
+class SpawningAgent:
+    async def process(self):
+        await asyncio.create_task(untagged_work())
+
+@pytest.mark.asyncio
+async def test_sampling_profiler_tags_and_exports(tmp_path):
+    """Test that samples under the run are tagged by agent and exported as flamegraph files."""
+    agent = BusyAgent()
+    profiler = SamplingProfiler(code_tags({"research": [agent]}), interval=0.001, include_loop=False)
+
+    async def run():
+        profiler.attach(sys._getframe())
+        await agent.process()
+
+    profiler.start()
+    try:
+        await run()
+    finally:
+        profiler.stop()
+
+    assert profiler.summary().get("research", 0) > 0
+    first_line = profiler.collapsed().splitlines()[0]
+    assert first_line.startswith("agent:research;")
+    assert "process (test_profiling.py:" in first_line
+
+    paths = profiler.export("Busy goal", directory=str(tmp_path))
+    with open(paths["speedscope"]) as f:
+        speedscope = json.load(f)
+    assert [profile["name"] for profile in speedscope["profiles"]] == ["Busy goal [research]"]
+    assert speedscope["profiles"][0]["type"] == "sampled"
+
+@pytest.mark.asyncio
+async def test_tasks_created_by_the_run_keep_the_creating_agents_tag():
+    """Test that work in a task an agent spawns is attributed to that agent, not the event loop."""
+    agent = SpawningAgent()
+    profiler = SamplingProfiler(code_tags({"research": [agent]}), interval=0.001)
+
+    async def run():
+        profiler.attach(sys._getframe())
+        await agent.process()
+
+    profiler.start()
+    try:
+        await run()
+    finally:
+        profiler.stop()
+
+    summary = profiler.summary()
+    assert summary.get("research", 0) > 0
+    assert summary.get("event-loop", 0) < summary["research"] / 4
+
+@pytest.mark.asyncio
+async def test_concurrent_profilers_record_loop_work_once():
+    """Test that loop-level work is recorded by one profiler and a run's work only by its own."""
+    agent = BusyAgent()
+    first = SamplingProfiler({}, interval=0.001)
+    second = SamplingProfiler(code_tags({"research": [agent]}), interval=0.001)
+
+    async def run():
+        second.attach(sys._getframe())
+        await agent.process()
+
+    first.start()
+    second.start()
+    try:
+        await asyncio.create_task(run())
+        await untagged_work()
+    finally:
+        second.stop()
+        first.stop()
+
+    assert first.summary().get("event-loop", 0) > 0
+    assert "research" not in first.summary()
+    assert set(second.summary()) == {"research"}
+
+@pytest.mark.asyncio
+async def test_sampled_seconds_match_busy_wall_time():
+    """Test that samples are weighted by the measured gap, not the nominal interval."""
+    agent = BusyAgent()
+    profiler = SamplingProfiler(code_tags({"research": [agent]}), interval=0.001, include_loop=False)
+
+    async def run():
+        profiler.attach(sys._getframe())
+        await agent.process()
+
+    profiler.start()
+    try:
+        await run()
+    finally:
+        profiler.stop()
+
+    assert 0.15 <= profiler.summary()["research"] <= 0.3
@@ -0,0 +1,37 @@
+
+
+import time
+from utils.result_store import ResultStore, normalize_goal
+
+def make_result(text, score):
+    return {
+        "final_output": {"data": {"synthesized_output": text}, "context": {}, "status": "completed"},
+        "evaluation": {"goal_satisfaction": score, "iterations_required": 0, "success": score >= 0.8},
+        "agent_order": ["research", "synthesis"],
+        "plan": "Research, then synthesize.",
+        "timings": {"planning": 0.5, "total": 2.0}
+    }
+
+def test_save_and_search_runs(tmp_path):
+    """Test that stored runs are found by full-text search over goal and report."""
+    store = ResultStore(str(tmp_path / "runs.db"))
+    spacex_id = store.save_run("Next SpaceX launch weather", make_result("Clear skies over Cape Canaveral.", 0.9))
+    store.save_run("AI in healthcare", make_result("Diagnostics will improve.", 0.7))
+
+    assert [run["id"] for run in store.search("canaveral")] == [spacex_id]
+    assert [run["id"] for run in store.search("SpaceX: weather?")] == [spacex_id]
+    assert store.get(spacex_id)["timings"]["planning"] == 0.5
+    assert [run["goal"] for run in store.recent(min_score=0.8)] == ["Next SpaceX launch weather"]
+
+def test_find_reusable_respects_goal_score_and_age(tmp_path):
+    """Test that only fresh, successful runs of the same normalized goal are reused."""
+    store = ResultStore(str(tmp_path / "runs.db"))
+    store.save_run("AI in healthcare", make_result("Low quality.", 0.3))
+    good_id = store.save_run("AI  in Healthcare", make_result("High quality.", 0.9))
+
+    assert normalize_goal(" AI in  HEALTHCARE ") == "ai in healthcare"
+    assert store.find_reusable("ai in healthcare", max_age=60, min_score=0.8)["id"] == good_id
+    assert store.find_reusable("ai in finance", max_age=60, min_score=0.8) is None
+
+    store.conn.execute("UPDATE runs SET created_at = ?", (time.time() - 120,))
+    assert store.find_reusable("ai in healthcare", max_age=60, min_score=0.8) is None
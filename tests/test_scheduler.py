@@ -0,0 +1,64 @@
+
+
+import pytest
+import asyncio
+from utils.scheduler import GoalScheduler, StagePool, resource_slot, using_pools
+
+def make_scheduler(order, **kwargs):
+    """Scheduler whose jobs record their start order and then yield once."""
+    async def run(goal):
+        order.append(goal)
+        await asyncio.sleep(0)
+        return {"goal": goal}
+    return GoalScheduler(run, max_concurrent_goals=1, **kwargs)
+
+@pytest.mark.asyncio
+async def test_higher_priority_classes_run_first():
+    """Test that queued interactive goals overtake queued batch goals."""
+    order = []
+    scheduler = make_scheduler(order)
+    blocker = asyncio.ensure_future(scheduler.submit("running"))
+    await asyncio.sleep(0)
+
+    batch = asyncio.ensure_future(scheduler.submit("batch", priority="batch"))
+    interactive = asyncio.ensure_future(scheduler.submit("interactive", priority="interactive"))
+    await asyncio.gather(blocker, batch, interactive)
+
+    assert order == ["running", "interactive", "batch"]
+    assert scheduler.metrics()["queue_depth"] == {"interactive": 0, "normal": 0, "batch": 0}
+
+@pytest.mark.asyncio
+async def test_tenants_share_by_weight():
+    """Test that a tenant with twice the weight gets twice the dispatches."""
+    order = []
+    scheduler = make_scheduler(order, tenant_weights={"heavy": 2.0})
+    blocker = asyncio.ensure_future(scheduler.submit("running"))
+    await asyncio.sleep(0)
+
+    jobs = [asyncio.ensure_future(scheduler.submit(f"heavy-{i}", tenant="heavy")) for i in range(4)]
+    jobs += [asyncio.ensure_future(scheduler.submit(f"light-{i}", tenant="light")) for i in range(4)]
+    await asyncio.gather(blocker, *jobs)
+
+    first_six = [goal.split("-")[0] for goal in order[1:7]]
+    assert first_six.count("heavy") == 4
+    assert first_six.count("light") == 2
+
+@pytest.mark.asyncio
+async def test_stage_pool_limits_concurrency_of_child_tasks():
+    """Test that calls from tasks a goal creates draw from its pool and never exceed the limit."""
+    pools = {"llm": StagePool("llm", 2)}
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with resource_slot("llm"):
+            peak = max(peak, pools["llm"].in_use)
+            await asyncio.sleep(0.01)
+
+    with using_pools(pools):
+        tasks = [asyncio.create_task(call()) for _ in range(5)]
+    await asyncio.gather(*tasks)
+    await call()
+
+    assert peak == 2
+    assert pools["llm"].metrics()["wait"]["count"] == 5
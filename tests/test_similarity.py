@@ -0,0 +1,98 @@
+
+
+import time
+from main import MultiAgentOrchestrator
+from utils.config import settings
+from utils.similarity import GoalIndex, goal_shingles, jaccard
+
+def test_reworded_goals_share_shingles():
+    """Test that wording, order, possessives and plurals do not change the shingles."""
+    assert goal_shingles("next SpaceX launch weather") == goal_shingles("Weather for SpaceX's next launch")
+    assert goal_shingles("upcoming launches") == goal_shingles("the upcoming launch")
+
+def test_question_words_keep_different_questions_apart():
+    """Test that goals differing in what they ask about the same entities do not match."""
+    pairs = [
+        ("When is the next SpaceX launch", "Where is the next SpaceX launch"),
+        ("Which SpaceX launch was delayed", "Will SpaceX launch be delayed"),
+    ]
+    for first, second in pairs:
+        assert jaccard(goal_shingles(first), goal_shingles(second)) < settings.SIMILAR_GOAL_THRESHOLD
+        index = GoalIndex()
+        index.add(1, first)
+        assert index.query(second, settings.SIMILAR_GOAL_THRESHOLD) == []
+
+def test_goal_index_finds_near_duplicates_above_threshold():
+    """Test that the index returns only goals above the similarity threshold, best first."""
+    index = GoalIndex()
+    index.add(1, "next SpaceX launch weather")
+    index.add(2, "next SpaceX launch weather delay risk")
+    index.add(3, "AI impact on healthcare")
+
+    matches = index.query("weather for SpaceX's next launch", threshold=0.6)
+
+    assert [key for key, _ in matches] == [1, 2]
+    assert matches[0][1] == 1.0
+    assert index.query("weather for SpaceX's next launch", threshold=0.9) == [(1, 1.0)]
+
+def test_orchestrator_reuses_result_then_plan_of_similar_goal(tmp_path, monkeypatch):
+    """Test that a fresh similar run is reused whole and an older one only for its plan."""
+    monkeypatch.setattr(settings, "RESULT_STORE_PATH", str(tmp_path / "runs.db"))
+    orchestrator = MultiAgentOrchestrator()
+    result = {
+        "final_output": {"data": {"synthesized_output": "Clear skies."}},
+        "evaluation": {"goal_satisfaction": 0.9, "success": True},
+        "agent_order": ["research", "synthesis"],
+        "plan": "Research the launch, then report.",
+        "timings": {}
+    }
+    run_id = orchestrator.store.save_run("next SpaceX launch weather", result)
+    orchestrator.goal_index.add(run_id, "next SpaceX launch weather")
+
+    run, plan = orchestrator._find_similar_run("weather for SpaceX's next launch")
+    assert run["id"] == run_id and plan is None
+
+    orchestrator.store.conn.execute("UPDATE runs SET created_at = ?", (time.time() - 2 * settings.RESULT_REUSE_MAX_AGE,))
+    run, plan = orchestrator._find_similar_run("weather for SpaceX's next launch")
+    assert run is None
+    assert plan["agent_order"] == ["research", "synthesis"]
+    assert plan["data"]["plan"] == "Research the launch, then report."
+
+def test_orchestrator_reuses_only_the_plan_of_a_merely_similar_goal(tmp_path, monkeypatch):
+    """Test that a fresh run whose goal is similar but not the same is not reused whole."""
+    monkeypatch.setattr(settings, "RESULT_STORE_PATH", str(tmp_path / "runs.db"))
+    orchestrator = MultiAgentOrchestrator()
+    result = {
+        "final_output": {"data": {"synthesized_output": "Clear skies."}},
+        "evaluation": {"goal_satisfaction": 0.9, "success": True},
+        "agent_order": ["research", "synthesis"],
+        "plan": "Research the launch, then report.",
+        "timings": {}
+    }
+    run_id = orchestrator.store.save_run("next SpaceX launch weather", result)
+    orchestrator.goal_index.add(run_id, "next SpaceX launch weather")
+
+    run, plan = orchestrator._find_similar_run("next SpaceX launch weather tomorrow")
+    assert run is None
+    assert plan["agent_order"] == ["research", "synthesis"]
+    assert orchestrator._find_similar_run("When is the next SpaceX launch") == (None, None)
+
+def test_orchestrator_finds_the_fresh_run_among_repeated_goals(tmp_path, monkeypatch):
+    """Test that older runs of the same goal do not crowd the newest one out of the lookup."""
+    monkeypatch.setattr(settings, "RESULT_STORE_PATH", str(tmp_path / "runs.db"))
+    orchestrator = MultiAgentOrchestrator()
+    result = {
+        "final_output": {"data": {"synthesized_output": "Clear skies."}},
+        "evaluation": {"goal_satisfaction": 0.9, "success": True},
+        "agent_order": ["research", "synthesis"],
+        "plan": "Research the launch, then report.",
+        "timings": {}
+    }
+    run_ids = [orchestrator.store.save_run("next SpaceX launch weather", result) for _ in range(8)]
+    orchestrator.store.conn.execute("UPDATE runs SET created_at = ? WHERE id < ?", (time.time() - 30 * 24 * 3600, run_ids[-1]))
+    for run_id in run_ids:
+        orchestrator.goal_index.add(run_id, "next SpaceX launch weather")
+
+    assert orchestrator.goal_index.query("weather for SpaceX's next launch", 0.8)[0] == (run_ids[-1], 1.0)
+    run, plan = orchestrator._find_similar_run("weather for SpaceX's next launch")
+    assert run["id"] == run_ids[-1] and plan is None
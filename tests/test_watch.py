@@ -0,0 +1,86 @@
+
+
+import json
+import pytest
+from utils.watch import WEATHER_TOLERANCES, ConditionalFetcher, LaunchWatcher, material_weather_state, diff_states
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self._body = body
+        self.headers = headers or {}
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeSession:
+    """Serves scripted responses and records the request headers."""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, params=None, headers=None):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+@pytest.mark.asyncio
+async def test_conditional_fetcher_revalidates_and_hashes():
+    """Test ETag revalidation and the content-hash fallback."""
+    body = json.dumps({"result": [1]}).encode()
+    session = FakeSession([
+        FakeResponse(200, body, {"ETag": '"v1"'}),
+        FakeResponse(304),
+        FakeResponse(200, body),
+        FakeResponse(200, json.dumps({"result": [2]}).encode()),
+    ])
+    fetcher = ConditionalFetcher()
+
+    assert await fetcher.fetch(session, "http://launches") == (True, {"result": [1]})
+    assert await fetcher.fetch(session, "http://launches") == (False, {"result": [1]})
+    assert session.sent_headers[1]["If-None-Match"] == '"v1"'
+    assert await fetcher.fetch(session, "http://launches") == (False, {"result": [1]})
+    assert await fetcher.fetch(session, "http://launches") == (True, {"result": [2]})
+    assert fetcher.stats == {"requests": 4, "not_modified": 1, "same_content": 1, "changed": 2}
+
+def weather(temp, wind, clouds):
+    return {"weather": [{"description": "clear sky"}], "main": {"temp": temp}, "wind": {"speed": wind}, "clouds": {"all": clouds}}
+
+def test_weather_state_ignores_immaterial_fluctuations():
+    """Test that only changes at launch-relevant resolution are reported."""
+    calm = material_weather_state(weather(22.1, 3.2, 41), {})
+    assert diff_states(calm, material_weather_state(weather(22.4, 3.7, 44), {}), WEATHER_TOLERANCES) == {}
+
+    windy = material_weather_state(weather(22.1, 16.0, 41), {})
+    changes = diff_states(calm, windy, WEATHER_TOLERANCES)
+    assert changes["wind_speed"] == (3.2, 16.0)
+    assert "weather_impacts" in changes
+
+@pytest.mark.asyncio
+async def test_watcher_does_not_report_bin_edge_jitter(monkeypatch):
+    """Test that values hovering around a bin edge are quiet while real drift is reported once."""
+    launch = {"id": 1, "name": "Starlink", "provider": {"name": "SpaceX"}, "pad": {"location": {"id": 7}}}
+    readings = iter([weather(22.98, 4.99, 39), weather(23.01, 5.01, 41), weather(22.97, 5.0, 40), weather(23.7, 5.5, 35), weather(24.0, 5.0, 40)])
+    watcher = LaunchWatcher()
+
+    async def fetch(session, url, params=None):
+        if params is None:
+            return False, {"result": [launch]}
+        return True, next(readings)
+
+    async def location_for(launch):
+        return {"lat": 28.5, "lon": -80.6}
+
+    monkeypatch.setattr(watcher.fetcher, "fetch", fetch)
+    monkeypatch.setattr(watcher, "_location_for", location_for)
+
+    assert "temperature" in (await watcher.poll(None))["changes"]
+    assert (await watcher.poll(None))["changes"] == {}
+    assert (await watcher.poll(None))["changes"] == {}
+    assert (await watcher.poll(None))["changes"] == {}
+    assert (await watcher.poll(None))["changes"] == {"temperature": (22.98, 24.0)}
@@ -54,17 +54,21 @@ async def get_spacex_launch() -> Dict[str, Any]:
                 raise Exception(f"RocketLaunch.Live API error: {response.status} {await response.text()}")
             
             data = await response.json()
-            launches = data.get("result", [])
+            return find_spacex_launch(data)
 
-            if not launches:
-                raise Exception("No upcoming launches found from RocketLaunch.Live API.")
+def find_spacex_launch(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the first SpaceX launch from a RocketLaunch.Live launches response."""
+    launches = data.get("result", [])
 
-            for launch in launches:
-                provider_name = launch.get("provider", {}).get("name")
-                if provider_name and "spacex" in provider_name.lower():
-                    return launch
-            
-            raise Exception("No SpaceX launch found in the next 5 upcoming launches.")
+    if not launches:
+        raise Exception("No upcoming launches found from RocketLaunch.Live API.")
+
+    for launch in launches:
+        provider_name = launch.get("provider", {}).get("name")
+        if provider_name and "spacex" in provider_name.lower():
+            return launch
+    
+    raise Exception("No SpaceX launch found in the next 5 upcoming launches.")
 
 # get_weather remains the same
 async def get_weather(lat: float, lon: float) -> Dict[str, Any]:
@@ -16,7 +16,44 @@ class Settings(BaseSettings):
     # Agent configuration
     MAX_ITERATIONS: int = 5
     CONFIDENCE_THRESHOLD: float = 0.8
-    
+
+    # Model routing: planning/research/analysis use the fast tier, synthesis the large one.
+    FAST_MODEL: str = "gemini-2.5-flash-preview-05-20"
+    LARGE_MODEL: str = "gemini-2.5-pro"
+    # Prompts longer than this (in characters) are promoted to the large tier.
+    LARGE_PROMPT_CHARS: int = 24000
+
+    # Hedged requests: fire a duplicate once a request outlives the model's p95.
+    HEDGE_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 95.0
+    HEDGE_DEFAULT_DELAY: float = 8.0  # seconds, used until enough samples exist
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_WINDOW: int = 500
+
+    # Run history: every run is stored here ("" disables). With --reuse, fresh,
+    # successful runs of the same goal are returned instead of re-executed.
+    RESULT_STORE_PATH: str = "runs.db"
+    RESULT_REUSE_MAX_AGE: float = 3600.0  # seconds
+    # Near-duplicate goals (token Jaccard >= SIMILAR_GOAL_THRESHOLD) reuse the
+    # plan of a successful run up to SIMILAR_PLAN_MAX_AGE old. A fresh result is
+    # only reused whole at SIMILAR_RESULT_THRESHOLD (1.0 = same content words).
+    SIMILAR_GOAL_THRESHOLD: float = 0.8
+    SIMILAR_RESULT_THRESHOLD: float = 1.0
+    SIMILAR_PLAN_MAX_AGE: float = 7 * 24 * 3600.0  # seconds
+    SIMILAR_GOAL_INDEX_SIZE: int = 20000  # most recent runs indexed at startup
+
+    # Watch mode: seconds between launch/weather polls.
+    WATCH_INTERVAL: float = 300.0
+
+    # Scheduler for many concurrent goals in one process.
+    SCHEDULER_MAX_CONCURRENT_GOALS: int = 4
+    SCHEDULER_LLM_CONCURRENCY: int = 4  # model calls in flight, from any agent
+    SCHEDULER_HTTP_CONCURRENCY: int = 8  # launch/weather fetches (including prefetches) in flight
+
+    # Opt-in sampling profiler (--profile): sample period and output directory.
+    PROFILE_INTERVAL: float = 0.005  # seconds
+    PROFILE_DIR: str = "profiles"
+
     # API endpoints
     GOOGLE_AI_ENDPOINT: str = "https://generativelanguage.googleapis.com/v1beta/models"
     # DEPRECATED: We are no longer using this.
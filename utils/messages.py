@@ -0,0 +1,176 @@
+import json
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library.
+    orjson = None
+
+
+class PayloadEvictedError(LookupError):
+    """Raised when a payload ref must be resolved but its blob has been evicted."""
+
+
+class PayloadRef:
+    """Compact, immutable handle to a raw payload held in a PayloadStore."""
+
+    __slots__ = ("blob_id", "kind")
+
+    def __init__(self, blob_id: int, kind: str):
+        object.__setattr__(self, "blob_id", blob_id)
+        object.__setattr__(self, "kind", kind)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("PayloadRef is immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, PayloadRef) and other.blob_id == self.blob_id
+
+    def __hash__(self) -> int:
+        return hash(self.blob_id)
+
+    def __repr__(self) -> str:
+        return f"PayloadRef({self.kind}:{self.blob_id})"
+
+
+class PayloadStore:
+    """
+    Holds raw API payloads once so messages can carry references instead of
+    the payloads themselves. The oldest blobs are evicted past max_blobs.
+    """
+
+    def __init__(self, max_blobs: int = 256):
+        self.max_blobs = max_blobs
+        self._blobs: "OrderedDict[int, Any]" = OrderedDict()
+        self._refs_by_object: Dict[int, PayloadRef] = {}
+        self._next_id = 1
+        self.stats = {"stored": 0, "deduplicated": 0, "resolved": 0, "evicted": 0}
+
+    def put(self, kind: str, payload: Any) -> PayloadRef:
+        """Store a payload (or return the existing ref if this object is already stored)."""
+        existing = self._refs_by_object.get(id(payload))
+        if existing is not None and self._blobs.get(existing.blob_id) is payload:
+            self.stats["deduplicated"] += 1
+            return existing
+
+        ref = PayloadRef(self._next_id, kind)
+        self._next_id += 1
+        self._blobs[ref.blob_id] = payload
+        self._refs_by_object[id(payload)] = ref
+        self.stats["stored"] += 1
+
+        while len(self._blobs) > self.max_blobs:
+            _, evicted = self._blobs.popitem(last=False)
+            self._refs_by_object.pop(id(evicted), None)
+            self.stats["evicted"] += 1
+        return ref
+
+    def get(self, ref: PayloadRef) -> Optional[Any]:
+        """Return the payload behind a ref, or None if it has been evicted."""
+        payload = self._blobs.get(ref.blob_id)
+        if payload is not None:
+            self.stats["resolved"] += 1
+        return payload
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+payloads = PayloadStore()
+
+
+class AgentMessage(Mapping):
+    """
+    Immutable envelope passed between agents. It behaves like the read-only
+    dict agents used to exchange ("data", "context", "status" and, for the
+    planner, "agent_order"), so existing callers keep indexing it by key.
+
+    data and context are read-only views of a shallow copy taken at
+    construction. agent_order is stored as a tuple; indexing the message by
+    "agent_order" returns a fresh list, as the planner's dict did. Nested
+    values are shared with the sender and must not be mutated.
+    """
+
+    __slots__ = ("data", "context", "status", "agent_order")
+
+    def __init__(
+        self,
+        data: Mapping,
+        context: Mapping,
+        status: str,
+        agent_order: Optional[List[str]] = None,
+    ):
+        object.__setattr__(self, "data", MappingProxyType(dict(data)))
+        object.__setattr__(self, "context", MappingProxyType(dict(context)))
+        object.__setattr__(self, "status", status)
+        object.__setattr__(self, "agent_order", tuple(agent_order) if agent_order is not None else None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("AgentMessage is immutable")
+
+    def _keys(self) -> tuple:
+        if self.agent_order is None:
+            return ("data", "context", "status")
+        return ("data", "context", "status", "agent_order")
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        if key == "agent_order":
+            return list(self.agent_order)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"AgentMessage(status={self.status!r}, data_keys={list(self.data)!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self._keys()}
+
+
+def _default(resolve_payloads: bool, errors: List[Exception]):
+    def default(obj: Any) -> Any:
+        if isinstance(obj, AgentMessage):
+            return obj.to_dict()
+        if isinstance(obj, PayloadRef):
+            if not resolve_payloads:
+                return {"$ref": f"{obj.kind}:{obj.blob_id}"}
+            payload = payloads.get(obj)
+            if payload is None:
+                error = PayloadEvictedError(f"{obj!r} was evicted from the payload store before it was serialized")
+                errors.append(error)
+                raise error
+            return payload
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        return str(obj)
+    return default
+
+
+def dumps(obj: Any, indent: bool = False, resolve_payloads: bool = True) -> str:
+    """
+    Serialize a message (or any value containing messages and payload refs).
+    Only call this at process boundaries: LLM prompts and persistence. With
+    resolve_payloads=False, refs are written as {"$ref": "kind:id"} placeholders;
+    otherwise a ref whose payload was evicted raises PayloadEvictedError.
+    """
+    errors: List[Exception] = []
+    default = _default(resolve_payloads, errors)
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode()
+        except orjson.JSONEncodeError:
+            # orjson replaces errors raised by `default` with a generic one.
+            if errors:
+                raise errors[0] from None
+            raise
+    return json.dumps(obj, default=default, indent=2 if indent else None)
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+import google.generativeai as genai
+from .config import settings
+from .latency import LatencyTracker
+from .scheduler import current_pool, resource_slot
+
+# Default tier for each agent. Planning, research and analysis return short,
+# structured answers, so they run on the fast model; synthesis writes the final
+# report and gets the larger one.
+AGENT_TIERS = {
+    "planner": "fast",
+    "research": "fast",
+    "analysis": "fast",
+    "synthesis": "large",
+}
+
+
+class ModelRouter:
+    """Picks a model tier per agent/prompt and optionally hedges slow requests."""
+
+    def __init__(self):
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        self.tiers = {"fast": settings.FAST_MODEL, "large": settings.LARGE_MODEL}
+        self._models: Dict[str, Any] = {}
+        # Latency of every individual request ("attempt"; cancelled hedge losers
+        # count with their elapsed time as a lower bound) and the latency the
+        # calling agent actually waited for ("observed").
+        self.attempt_latency: Dict[str, LatencyTracker] = {}
+        self.observed_latency: Dict[str, LatencyTracker] = {}
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+
+    def select_model(self, agent_name: str, prompt: str) -> str:
+        """Choose the model for an agent, promoting oversized prompts to the large tier."""
+        tier = AGENT_TIERS.get(agent_name, "fast")
+        if tier == "fast" and len(prompt) > settings.LARGE_PROMPT_CHARS:
+            tier = "large"
+        return self.tiers[tier]
+
+    def hedge_delay(self, model_name: str) -> float:
+        """Delay before firing a hedged duplicate: the p95 over all attempts, including cancelled ones."""
+        tracker = self.attempt_latency.get(model_name)
+        if tracker is None or len(tracker.samples) < settings.HEDGE_MIN_SAMPLES:
+            return settings.HEDGE_DEFAULT_DELAY
+        return tracker.percentile(settings.HEDGE_PERCENTILE)
+
+    async def generate(self, agent_name: str, prompt: str, hedge: Optional[bool] = None) -> Any:
+        """
+        Generate content for an agent, returning the raw model response. Every
+        request, including a hedged duplicate, holds its own slot in the running
+        goal's LLM pool, if any.
+        """
+        model_name = self.select_model(agent_name, prompt)
+        hedge = settings.HEDGE_ENABLED if hedge is None else hedge
+
+        start = time.perf_counter()
+        if hedge:
+            response = await self._hedged_attempt(model_name, prompt)
+        else:
+            response = await self._attempt(model_name, prompt)
+        self._tracker(self.observed_latency, model_name).record(time.perf_counter() - start)
+        return response
+
+    def metrics(self) -> Dict[str, Any]:
+        """Latency percentiles per model plus hedging counters."""
+        models = set(self.attempt_latency) | set(self.observed_latency)
+        return {
+            "models": {
+                name: {
+                    "attempt": self._tracker(self.attempt_latency, name).summary(),
+                    "observed": self._tracker(self.observed_latency, name).summary(),
+                }
+                for name in sorted(models)
+            },
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_skipped": self.hedges_skipped,
+        }
+
+    async def _attempt(self, model_name: str, prompt: str) -> Any:
+        async with resource_slot("llm"):
+            # Attempt latency excludes the wait for a pool slot.
+            start = time.perf_counter()
+            try:
+                response = await self._get_model(model_name).generate_content_async(prompt)
+            except asyncio.CancelledError:
+                # A cancelled hedge loser took at least this long. Leaving it out would
+                # keep only winners in the window and drag the hedge delay down.
+                self._tracker(self.attempt_latency, model_name).record(time.perf_counter() - start)
+                raise
+            self._tracker(self.attempt_latency, model_name).record(time.perf_counter() - start)
+            return response
+
+    async def _hedged_attempt(self, model_name: str, prompt: str) -> Any:
+        """Race a primary request against a duplicate fired after the hedge delay."""
+        primary = asyncio.ensure_future(self._attempt(model_name, prompt))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay(model_name))
+            if done:
+                return primary.result()
+
+            pool = current_pool("llm")
+            if pool is not None and pool.waiting:
+                # A duplicate would only queue behind other calls, so keep waiting on the primary.
+                self.hedges_skipped += 1
+                return await primary
+
+            self.hedges_fired += 1
+            backup = asyncio.ensure_future(self._attempt(model_name, prompt))
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedges_won += 1
+                        return task.result()
+            # Both requests failed; surface the primary's error.
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _get_model(self, model_name: str) -> Any:
+        if model_name not in self._models:
+            self._models[model_name] = genai.GenerativeModel(model_name)
+        return self._models[model_name]
+
+    @staticmethod
+    def _tracker(trackers: Dict[str, LatencyTracker], model_name: str) -> LatencyTracker:
+        if model_name not in trackers:
+            trackers[model_name] = LatencyTracker(settings.HEDGE_WINDOW)
+        return trackers[model_name]
+
+
+router = ModelRouter()
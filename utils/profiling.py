@@ -0,0 +1,276 @@
+import asyncio
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from types import CodeType, FrameType
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .config import settings
+
+# A frame is identified by (function, file, first line).
+FrameKey = Tuple[str, str, int]
+
+LOOP_TAG = "event-loop"
+RUN_TAG = "orchestrator"
+
+_export_sequence = itertools.count(1)
+
+# The profiler of the run executing in the current task. Tasks the run creates
+# inherit it, so the task factory below can hand their frames to that profiler.
+_run_profiler: ContextVar[Optional["SamplingProfiler"]] = ContextVar("run_profiler", default=None)
+
+# Running profilers per sampled thread, in start order.
+_active: Dict[int, List["SamplingProfiler"]] = {}
+_active_lock = threading.Lock()
+
+
+def code_tags(tagged_objects: Dict[str, Iterable[Any]]) -> Dict[CodeType, str]:
+    """
+    Map the code objects of every method on the given objects' classes to a tag,
+    so samples can be attributed to the agent whose code is on the stack.
+    """
+    tags: Dict[CodeType, str] = {}
+    for tag, objects in tagged_objects.items():
+        for obj in objects:
+            functions = [obj] if hasattr(obj, "__code__") else list(vars(type(obj)).values())
+            for function in functions:
+                code = getattr(function, "__code__", None)
+                if code is not None:
+                    tags.setdefault(code, tag)
+    return tags
+
+
+class SamplingProfiler:
+    """
+    Samples the event-loop thread's Python stack from a background thread.
+
+    Samples whose stack contains the attached run's root frame, or the root
+    frame of a task the run created (prefetches, hedged attempts), are tagged
+    with the outermost agent on the stack; a task's samples take the tag of
+    the agent that created it. Other busy samples (aiohttp/grpc callbacks,
+    which run directly off the loop) are event-loop work that cannot be
+    attributed to one run: with several profilers running, only the first
+    one records them, and only outside every profiled run. Samples of the idle
+    loop waiting in select() are dropped.
+    """
+
+    def __init__(self, tags: Dict[CodeType, str], interval: Optional[float] = None, include_loop: bool = True):
+        self.tags = tags
+        self.interval = interval or settings.PROFILE_INTERVAL
+        self.include_loop = include_loop
+        # (tag, stack) -> seconds, each sample weighted by the measured time since
+        # the previous one: after every wait the sampler also has to win the GIL
+        # back from the busy loop thread, so the real period exceeds interval.
+        self.seconds: Counter = Counter()
+        self.sample_count = 0
+        self.dropped_idle = 0
+        self._thread_id = threading.get_ident()
+        self._root: Optional[FrameType] = None
+        # Root frames of tasks the run created -> tag of the agent that created them.
+        self._children: Dict[FrameType, Optional[str]] = {}
+        self._token: Optional[Token] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def attach(self, root_frame: FrameType) -> None:
+        """
+        Scope tagging to the run whose coroutine owns this frame. Call it from
+        that coroutine so tasks it creates from then on are followed too.
+        """
+        self._root = root_frame
+        self._token = _run_profiler.set(self)
+        try:
+            _install_task_factory(asyncio.get_running_loop())
+        except RuntimeError:
+            pass  # No running loop: only the root frame's stack is tagged.
+
+    def adopt(self, task: asyncio.Task, creator: FrameType) -> None:
+        """Follow a task created by the run, tagged like the code that created it."""
+        frame = getattr(task.get_coro(), "cr_frame", None)
+        if frame is None or self._root is None:
+            return
+        tag = self._attribute(creator)
+        self._children[frame] = None if tag == RUN_TAG else tag
+        task.add_done_callback(lambda _: self._children.pop(frame, None))
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        with _active_lock:
+            _active.setdefault(self._thread_id, []).append(self)
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with _active_lock:
+            profilers = _active.get(self._thread_id, [])
+            if self in profilers:
+                profilers.remove(self)
+            if not profilers:
+                _active.pop(self._thread_id, None)
+        self.duration = time.perf_counter() - self.started_at
+        if self._token is not None:
+            try:
+                _run_profiler.reset(self._token)
+            except ValueError:
+                pass  # Attached from another task; its context went away with it.
+            self._token = None
+        self._root = None
+        self._children.clear()
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._sample(frame, now - last)
+            last = now
+
+    def _sample(self, leaf: FrameType, elapsed: float) -> None:
+        code = leaf.f_code
+        if code.co_name == "select" and code.co_filename.endswith("selectors.py"):
+            self.dropped_idle += 1
+            return
+
+        tag = self._attribute(leaf)
+        if tag is None:
+            if not self._records_loop_sample(leaf):
+                return
+            tag = LOOP_TAG
+
+        stack: List[FrameKey] = []
+        frame: Optional[FrameType] = leaf
+        while frame is not None and len(stack) < 256:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        self.seconds[(tag, tuple(stack))] += elapsed
+        self.sample_count += 1
+
+    def _attribute(self, leaf: FrameType) -> Optional[str]:
+        """Tag for a stack belonging to this run, or None if it belongs elsewhere."""
+        tag = None
+        frame: Optional[FrameType] = leaf
+        while frame is not None:
+            # The outermost tagged frame wins, e.g. planner code called during evaluation.
+            tag = self.tags.get(frame.f_code, tag)
+            if frame is self._root:
+                return tag or RUN_TAG
+            if frame in self._children:
+                return self._children.get(frame) or tag or RUN_TAG
+            frame = frame.f_back
+        return None
+
+    def _records_loop_sample(self, leaf: FrameType) -> bool:
+        """Whether this profiler records a sample that is outside its run as loop-level work."""
+        if not self.include_loop:
+            return False
+        with _active_lock:
+            profilers = list(_active.get(self._thread_id, ()))
+        owner = next((profiler for profiler in profilers if profiler.include_loop), self)
+        if owner is not self:
+            return False
+        return all(profiler._attribute(leaf) is None for profiler in profilers if profiler is not self)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format: "tag;root;...;leaf microseconds" per line."""
+        lines = []
+        for (tag, stack), seconds in self.seconds.most_common():
+            names = [f"agent:{tag}"] + [_frame_label(key) for key in stack]
+            lines.append(f"{';'.join(names)} {round(seconds * 1e6)}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """A speedscope "sampled" profile with one profile per tag."""
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[Any, int] = {}
+
+        def index(key: Any) -> int:
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                if isinstance(key, str):
+                    frames.append({"name": key})
+                else:
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            return frame_index[key]
+
+        profiles = []
+        for tag in sorted({tag for tag, _ in self.seconds}):
+            samples, weights = [], []
+            for (sample_tag, stack), seconds in self.seconds.items():
+                if sample_tag == tag:
+                    samples.append([index(f"agent:{tag}")] + [index(key) for key in stack])
+                    weights.append(seconds)
+            profiles.append({
+                "type": "sampled",
+                "name": f"{name} [{tag}]",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "multi-agent sampling profiler",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def summary(self) -> Dict[str, float]:
+        """Wall-clock seconds per tag during which the loop thread was busy (not idle in select())."""
+        totals: Counter = Counter()
+        for (tag, _), seconds in self.seconds.items():
+            totals[tag] += seconds
+        return dict(totals.most_common())
+
+    def export(self, name: str, directory: Optional[str] = None) -> Dict[str, str]:
+        """Write collapsed-stack and speedscope files; returns their paths."""
+        directory = directory or settings.PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")[:40] or "run"
+        base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_export_sequence)}-{slug}")
+
+        paths = {"collapsed": f"{base}.collapsed.txt", "speedscope": f"{base}.speedscope.json"}
+        with open(paths["collapsed"], "w") as f:
+            f.write(self.collapsed())
+        with open(paths["speedscope"], "w") as f:
+            json.dump(self.speedscope(name), f)
+        return paths
+
+
+def _frame_label(key: FrameKey) -> str:
+    function, filename, line = key
+    return f"{function} ({os.path.basename(filename)}:{line})"
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    """Wrap the loop's task factory so tasks created during a profiled run are adopted by its profiler."""
+    previous = loop.get_task_factory()
+    if getattr(previous, "adopts_tasks", False):
+        return
+
+    def factory(loop: asyncio.AbstractEventLoop, coro: Any, **kwargs: Any) -> asyncio.Future:
+        if previous is None:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        else:
+            task = previous(loop, coro, **kwargs)
+        profiler = _run_profiler.get()
+        if profiler is not None and isinstance(task, asyncio.Task):
+            profiler.adopt(task, sys._getframe(1))
+        return task
+
+    factory.adopts_tasks = True
+    loop.set_task_factory(factory)
@@ -0,0 +1,217 @@
+import argparse
+import json
+import re
+import sqlite3
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
+from .config import settings
+from .messages import dumps
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    goal TEXT NOT NULL,
+    goal_key TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    score REAL,
+    success INTEGER,
+    plan TEXT,
+    agent_order TEXT,
+    final_output TEXT,
+    evaluation TEXT,
+    timings TEXT,
+    synthesized_text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_score ON runs(score);
+CREATE INDEX IF NOT EXISTS idx_runs_goal_key ON runs(goal_key, created_at);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(
+    goal, synthesized_text, content='runs', content_rowid='id'
+);
+"""
+
+JSON_COLUMNS = ("agent_order", "final_output", "evaluation", "timings")
+
+
+def normalize_goal(goal: str) -> str:
+    """Case- and whitespace-insensitive key used for exact-match reuse."""
+    return " ".join(goal.lower().split())
+
+
+class ResultStore:
+    """SQLite-backed history of orchestrator runs with full-text search."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.RESULT_STORE_PATH
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE scans.
+            self.fts_enabled = False
+        self.conn.commit()
+
+    def save_run(self, goal: str, result: Dict[str, Any]) -> int:
+        """Persist a result returned by MultiAgentOrchestrator.execute and return its id."""
+        evaluation = result.get("evaluation", {})
+        final_data = result.get("final_output", {}).get("data", {})
+        synthesized_text = final_data.get("synthesized_output", "") if isinstance(final_data, Mapping) else ""
+
+        with self.conn:
+            cursor = self.conn.execute(
+                """
+                INSERT INTO runs (goal, goal_key, created_at, score, success, plan, agent_order,
+                                  final_output, evaluation, timings, synthesized_text)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    goal,
+                    normalize_goal(goal),
+                    time.time(),
+                    evaluation.get("goal_satisfaction"),
+                    int(bool(evaluation.get("success"))),
+                    result.get("plan", ""),
+                    json.dumps(result.get("agent_order", [])),
+                    dumps(result.get("final_output", {})),
+                    json.dumps(evaluation),
+                    json.dumps(result.get("timings", {})),
+                    synthesized_text,
+                ),
+            )
+            run_id = cursor.lastrowid
+            if self.fts_enabled:
+                self.conn.execute(
+                    "INSERT INTO runs_fts (rowid, goal, synthesized_text) VALUES (?, ?, ?)",
+                    (run_id, goal, synthesized_text),
+                )
+        return run_id
+
+    def find_reusable(self, goal: str, max_age: float, min_score: float) -> Optional[Dict[str, Any]]:
+        """Most recent successful run for the same goal that is still fresh enough to reuse."""
+        row = self.conn.execute(
+            """
+            SELECT * FROM runs
+            WHERE goal_key = ? AND created_at >= ? AND score >= ?
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (normalize_goal(goal), time.time() - max_age, min_score),
+        ).fetchone()
+        return self._row_to_run(row) if row else None
+
+    def recent_goals(self, limit: int) -> List[tuple]:
+        """(id, goal) pairs for the latest runs, used to seed the similarity index."""
+        return self.conn.execute(
+            "SELECT id, goal FROM runs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def get(self, run_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._row_to_run(row) if row else None
+
+    def recent(self, limit: int = 10, min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Latest runs, optionally only those scoring at least min_score."""
+        if min_score is None:
+            rows = self.conn.execute(
+                "SELECT * FROM runs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT * FROM runs WHERE score >= ? ORDER BY created_at DESC LIMIT ?",
+                (min_score, limit),
+            ).fetchall()
+        return [self._row_to_run(row) for row in rows]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Full-text search over goals and synthesized reports, best matches first."""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+
+        if self.fts_enabled:
+            # Quote every term so user punctuation cannot break FTS5 query syntax.
+            match = " ".join(f'"{term}"' for term in terms)
+            rows = self.conn.execute(
+                """
+                SELECT runs.* FROM runs_fts
+                JOIN runs ON runs.id = runs_fts.rowid
+                WHERE runs_fts MATCH ?
+                ORDER BY bm25(runs_fts) LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        else:
+            clauses = " AND ".join("(goal LIKE ? OR synthesized_text LIKE ?)" for _ in terms)
+            params: List[Any] = []
+            for term in terms:
+                params.extend([f"%{term}%", f"%{term}%"])
+            rows = self.conn.execute(
+                f"SELECT * FROM runs WHERE {clauses} ORDER BY created_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [self._row_to_run(row) for row in rows]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @staticmethod
+    def _row_to_run(row: sqlite3.Row) -> Dict[str, Any]:
+        run = dict(row)
+        for column in JSON_COLUMNS:
+            if run.get(column):
+                run[column] = json.loads(run[column])
+        return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query stored multi-agent runs")
+    parser.add_argument("--db", default=settings.RESULT_STORE_PATH, help="Path to the SQLite store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = subparsers.add_parser("search", help="Full-text search over goals and reports")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=10)
+
+    recent_parser = subparsers.add_parser("recent", help="List the latest runs")
+    recent_parser.add_argument("--limit", type=int, default=10)
+    recent_parser.add_argument("--min-score", type=float, default=None)
+
+    show_parser = subparsers.add_parser("show", help="Print one run's report")
+    show_parser.add_argument("run_id", type=int)
+
+    args = parser.parse_args()
+    store = ResultStore(args.db)
+
+    start = time.perf_counter()
+    if args.command == "search":
+        runs = store.search(args.query, args.limit)
+    elif args.command == "recent":
+        runs = store.recent(args.limit, args.min_score)
+    else:
+        run = store.get(args.run_id)
+        runs = [run] if run else []
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.command == "show" and runs:
+        run = runs[0]
+        print(f"Run {run['id']}: {run['goal']}")
+        print(f"Score: {run['score']}  Timings: {run['timings']}")
+        print(f"\nPlan:\n{run['plan']}")
+        print(f"\nReport:\n{run['synthesized_text'] or 'No synthesized output.'}")
+    else:
+        for run in runs:
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["created_at"]))
+            score = f"{run['score']:.2f}" if run["score"] is not None else "n/a"
+            print(f"[{run['id']}] {created}  score {score}  {run['goal']}")
+    print(f"\n{len(runs)} run(s) in {elapsed_ms:.1f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, Optional
+from .config import settings
+from .latency import LatencyTracker
+
+# Lower value = dispatched first. Within a class, tenants get fair shares.
+PRIORITY_CLASSES = {"interactive": 0, "normal": 1, "batch": 2}
+
+
+
+class StagePool:
+    """Concurrency limit for one kind of stage, with occupancy and wait-time metrics."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_use = 0
+        self.waiting = 0
+        self.wait_times = LatencyTracker()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_times.record(time.perf_counter() - start)
+        self.in_use += 1
+        try:
+            yield
+        finally:
+            self.in_use -= 1
+            self._semaphore.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "in_use": self.in_use, "waiting": self.waiting, "wait": self.wait_times.summary()}
+
+
+# Pools of the goal running in the current task. Tasks the goal creates
+# (prefetches, hedged attempts) inherit them with the rest of the context.
+_current_pools: ContextVar[Dict[str, StagePool]] = ContextVar("stage_pools", default={})
+
+
+@contextmanager
+def using_pools(pools: Dict[str, StagePool]) -> Iterator[None]:
+    """Make these pools the ones resource_slot draws from in this task and its children."""
+    token = _current_pools.set(pools)
+    try:
+        yield
+    finally:
+        _current_pools.reset(token)
+
+
+def current_pool(kind: str) -> Optional[StagePool]:
+    """The current goal's pool for one kind of call, or None outside using_pools."""
+    return _current_pools.get().get(kind)
+
+
+@asynccontextmanager
+async def resource_slot(kind: str) -> AsyncIterator[None]:
+    """
+    Hold a slot in the current pool for one kind of call ("llm" or "http");
+    a no-op outside using_pools or for a kind without a pool.
+    """
+    pool = current_pool(kind)
+    if pool is None:
+        yield
+        return
+    async with pool.slot():
+        yield
+
+
+class _Job:
+    __slots__ = ("goal", "tenant", "priority", "options", "future", "enqueued_at")
+
+    def __init__(self, goal: str, tenant: str, priority: str, options: Dict[str, Any], future: asyncio.Future):
+        self.goal = goal
+        self.tenant = tenant
+        self.priority = priority
+        self.options = options
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class GoalScheduler:
+    """
+    Admits goals to `run` by strict priority class, then by weighted fair share
+    between tenants within a class (start-time fair queueing), with at most
+    max_concurrent_goals running at once.
+    """
+
+    def __init__(
+        self,
+        run: Callable[..., Awaitable[Dict[str, Any]]],
+        max_concurrent_goals: Optional[int] = None,
+        tenant_weights: Optional[Dict[str, float]] = None,
+    ):
+        self.run = run
+        self.max_concurrent_goals = max_concurrent_goals or settings.SCHEDULER_MAX_CONCURRENT_GOALS
+        self.tenant_weights = dict(tenant_weights or {})
+        self.pools = {
+            "llm": StagePool("llm", settings.SCHEDULER_LLM_CONCURRENCY),
+            "http": StagePool("http", settings.SCHEDULER_HTTP_CONCURRENCY),
+        }
+        self._queues: Dict[str, Dict[str, Deque[_Job]]] = {name: {} for name in PRIORITY_CLASSES}
+        self._virtual_time: Dict[str, float] = {}
+        self._virtual_clock = 0.0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_times = {name: LatencyTracker() for name in PRIORITY_CLASSES}
+        self.tenant_wait_times: Dict[str, LatencyTracker] = {}
+        self._tasks: set = set()
+
+    async def submit(self, goal: str, tenant: str = "default", priority: str = "normal", **options: Any) -> Dict[str, Any]:
+        """Queue a goal and wait for its result. Extra options are passed to `run`."""
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class {priority!r}; expected one of {list(PRIORITY_CLASSES)}")
+        job = _Job(goal, tenant, priority, options, asyncio.get_running_loop().create_future())
+        self._queues[priority].setdefault(tenant, deque()).append(job)
+        self._dispatch()
+        return await job.future
+
+    def queue_depth(self) -> Dict[str, int]:
+        return {name: sum(len(jobs) for jobs in tenants.values()) for name, tenants in self._queues.items()}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, queue wait percentiles per class/tenant, and stage pool usage."""
+        return {
+            "queue_depth": self.queue_depth(),
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_wait": {name: tracker.summary() for name, tracker in self.wait_times.items()},
+            "tenant_queue_wait": {name: tracker.summary() for name, tracker in self.tenant_wait_times.items()},
+            "pools": {name: pool.metrics() for name, pool in self.pools.items()},
+        }
+
+    def _next_job(self) -> Optional[_Job]:
+        for priority in sorted(PRIORITY_CLASSES, key=PRIORITY_CLASSES.get):
+            tenants = {tenant: jobs for tenant, jobs in self._queues[priority].items() if jobs}
+            if not tenants:
+                continue
+            # A tenant returning after being idle starts at the current clock, so
+            # idleness does not bank credit for a later burst.
+            tenant = min(tenants, key=lambda t: max(self._virtual_time.get(t, 0.0), self._virtual_clock))
+            start = max(self._virtual_time.get(tenant, 0.0), self._virtual_clock)
+            self._virtual_clock = start
+            self._virtual_time[tenant] = start + 1.0 / self.tenant_weights.get(tenant, 1.0)
+            return tenants[tenant].popleft()
+        return None
+
+    def _dispatch(self) -> None:
+        while self.running < self.max_concurrent_goals:
+            job = self._next_job()
+            if job is None:
+                return
+            if job.future.cancelled():
+                continue
+            waited = time.perf_counter() - job.enqueued_at
+            self.wait_times[job.priority].record(waited)
+            self.tenant_wait_times.setdefault(job.tenant, LatencyTracker()).record(waited)
+            self.running += 1
+            task = asyncio.ensure_future(self._run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job: _Job) -> None:
+        try:
+            result = await self.run(job.goal, **job.options)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self.running -= 1
+            self._dispatch()
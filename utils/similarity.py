@@ -0,0 +1,106 @@
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, List, Tuple
+
+# Words that change the phrasing of a goal but not what it asks for. Question
+# words and tense markers (when/where/which/what/how/was/will) are kept: they
+# decide what is being asked about the same entities.
+STOPWORDS = frozenset("""
+a an and are at be by can check could do does find for from get give i in
+is it its me my of on or please show tell that the their then there this to
+with would you your
+""".split())
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _stem(token: str) -> str:
+    """Very light plural stripping so "launches" and "launch" share a shingle."""
+    if len(token) > 4 and token.endswith(("ches", "shes", "sses", "xes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def goal_shingles(goal: str) -> FrozenSet[str]:
+    """Normalized token set for a goal: lowercased, possessives and stopwords dropped."""
+    text = re.sub(r"['’]s\b", "", goal.lower())
+    return frozenset(_stem(token) for token in re.findall(r"[a-z0-9]+", text) if token not in STOPWORDS)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class GoalIndex:
+    """
+    MinHash LSH index over goal shingles. LSH only proposes candidates; each
+    one is verified with the exact Jaccard similarity of its shingles.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        # Permuted hash values per shingle; goal vocabularies are small, so most
+        # signatures are element-wise minimums of cached vectors.
+        self._shingle_vectors: Dict[str, List[int]] = {}
+        self._shingles: Dict[Hashable, FrozenSet[str]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def add(self, key: Hashable, goal: str) -> None:
+        """Index a goal under key (e.g. its run id). Goals without content words are skipped."""
+        shingles = goal_shingles(goal)
+        if not shingles or key in self._shingles:
+            return
+        self._shingles[key] = shingles
+        for band, band_key in enumerate(self._band_keys(shingles)):
+            self._buckets[band][band_key].append(key)
+
+    def query(self, goal: str, threshold: float, limit: int = 5) -> List[Tuple[Hashable, float]]:
+        """
+        Indexed keys whose goal has Jaccard similarity >= threshold, most similar
+        first. Ties go to the larger key, so with run ids the newest run wins.
+        """
+        shingles = goal_shingles(goal)
+        if not shingles:
+            return []
+
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(shingles)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            similarity = jaccard(shingles, self._shingles[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: (match[1], match[0]), reverse=True)
+        return matches[:limit]
+
+    def _shingle_vector(self, shingle: str) -> List[int]:
+        vector = self._shingle_vectors.get(shingle)
+        if vector is None:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+            vector = [(a * h + b) % _MERSENNE_PRIME for a, b in self._perms]
+            self._shingle_vectors[shingle] = vector
+        return vector
+
+    def _band_keys(self, shingles: FrozenSet[str]) -> List[Tuple[int, ...]]:
+        vectors = [self._shingle_vector(shingle) for shingle in shingles]
+        signature = list(map(min, zip(*vectors)))
+        return [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
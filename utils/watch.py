@@ -0,0 +1,155 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+import aiohttp
+from .config import settings
+from .api_helpers import find_spacex_launch, extract_launch_location, analyze_weather_impact
+
+
+class ConditionalFetcher:
+    """
+    Fetches JSON endpoints with ETag/Last-Modified revalidation. For servers
+    that send neither header, a hash of the body detects unchanged responses.
+    """
+
+    def __init__(self):
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._hashes: Dict[str, str] = {}
+        self._payloads: Dict[str, Any] = {}
+        self.stats = {"requests": 0, "not_modified": 0, "same_content": 0, "changed": 0}
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[bool, Any]:
+        """Return (changed, payload); payload is the cached one when nothing changed."""
+        key = url if not params else f"{url}?{json.dumps(params, sort_keys=True)}"
+        headers = {"Accept": "application/json"}
+        validators = self._validators.get(key, {})
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        self.stats["requests"] += 1
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 304 and key in self._payloads:
+                self.stats["not_modified"] += 1
+                return False, self._payloads[key]
+            if response.status != 200:
+                raise Exception(f"Watch fetch failed for {url}: {response.status}")
+
+            body = await response.read()
+            new_validators = {}
+            if response.headers.get("ETag"):
+                new_validators["etag"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                new_validators["last_modified"] = response.headers["Last-Modified"]
+            self._validators[key] = new_validators
+
+        digest = hashlib.sha256(body).hexdigest()
+        if self._hashes.get(key) == digest:
+            self.stats["same_content"] += 1
+            return False, self._payloads[key]
+
+        self._hashes[key] = digest
+        self._payloads[key] = json.loads(body)
+        self.stats["changed"] += 1
+        return True, self._payloads[key]
+
+
+def material_launch_state(launch: Dict[str, Any]) -> Dict[str, Any]:
+    """Launch fields whose change warrants a new report."""
+    pad = launch.get("pad", {})
+    return {
+        "launch_id": launch.get("id"),
+        "mission": launch.get("name"),
+        "t0": launch.get("t0"),
+        "window_open": launch.get("win_open"),
+        "window_close": launch.get("win_close"),
+        "pad": pad.get("name"),
+        "location_id": pad.get("location", {}).get("id"),
+    }
+
+
+# Numeric weather fields only count as changed once they move at least this far
+# from the last reported value. Crossing a launch constraint (wind > 15 m/s,
+# clouds > 80%) is always reported through weather_impacts.
+WEATHER_TOLERANCES = {"temperature": 1.0, "wind_speed": 1.0, "cloud_cover": 10.0}
+
+
+def material_weather_state(weather: Dict[str, Any], launch: Dict[str, Any]) -> Dict[str, Any]:
+    """Weather fields whose change warrants a new report; see WEATHER_TOLERANCES."""
+    analysis = analyze_weather_impact(weather, launch)
+    conditions = analysis["conditions"]
+    return {
+        "weather": conditions["description"],
+        "temperature": conditions["temperature"],
+        "wind_speed": conditions["wind_speed"],
+        "cloud_cover": conditions["clouds"],
+        "weather_impacts": tuple(analysis["potential_impacts"]),
+    }
+
+
+def diff_states(
+    old: Dict[str, Any],
+    new: Dict[str, Any],
+    tolerances: Optional[Dict[str, float]] = None,
+) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Map of field -> (old, new) for every field whose value changed. Numeric
+    fields listed in tolerances must differ by at least the tolerance.
+    """
+    tolerances = tolerances or {}
+    changes = {}
+    for key in sorted(set(old) | set(new)):
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        numeric = isinstance(before, (int, float)) and isinstance(after, (int, float))
+        if key in tolerances and numeric and abs(after - before) < tolerances[key]:
+            continue
+        changes[key] = (before, after)
+    return changes
+
+
+class LaunchWatcher:
+    """Polls the next SpaceX launch and the weather at its site, tracking material state."""
+
+    def __init__(self):
+        self.fetcher = ConditionalFetcher()
+        self.state: Dict[str, Any] = {}
+        # Launch sites rarely move; resolve each location id once.
+        self._locations: Dict[Any, Dict[str, float]] = {}
+
+    async def poll(self, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        """Fetch the current launch/weather and report material changes since the last poll."""
+        _, launches = await self.fetcher.fetch(session, settings.ROCKETLAUNCH_LIVE_API_ENDPOINT)
+        launch = find_spacex_launch(launches)
+        location = await self._location_for(launch)
+
+        weather = None
+        state = material_launch_state(launch)
+        if location:
+            params = {"lat": location["lat"], "lon": location["lon"], "appid": settings.OPENWEATHER_API_KEY, "units": "metric"}
+            _, weather = await self.fetcher.fetch(session, settings.OPENWEATHER_API_ENDPOINT, params)
+            state.update(material_weather_state(weather, launch))
+
+        changes = diff_states(self.state, state, WEATHER_TOLERANCES)
+        # Fields within tolerance keep their last reported value (hysteresis), so
+        # values hovering around a point never flap, while slow drift is
+        # reported once it adds up to the tolerance.
+        self.state = {key: value if key in changes else self.state.get(key, value) for key, value in state.items()}
+        return {
+            "launch": launch,
+            "location": location,
+            "weather": weather,
+            "state": self.state,
+            "changes": changes,
+        }
+
+    async def _location_for(self, launch: Dict[str, Any]) -> Optional[Dict[str, float]]:
+        location_id = launch.get("pad", {}).get("location", {}).get("id")
+        if location_id not in self._locations:
+            location = await extract_launch_location(launch)
+            if not location:
+                return None
+            self._locations[location_id] = location
+        return self._locations[location_id]